@@ -5,7 +5,7 @@ import json
 from typing import Dict, List
 
 from core.body_engine import BodyState
-from rag.knowledge_base import KnowledgeBase
+from rag.knowledge_base import get_default_knowledge_base
 from prompts.cue_writer_prompt import PROMPT_TEMPLATE
 
 
@@ -23,7 +23,7 @@ class CueWriterAgent:
         """
         self.llm_client = llm_client
         self.prompt_template = PROMPT_TEMPLATE
-        self.knowledge_base = KnowledgeBase()
+        self.knowledge_base = get_default_knowledge_base()
     
     def generate_cues(
         self,
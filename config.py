@@ -27,6 +27,11 @@ class Config:
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "")  # groq | gemini | ollama
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.5"))
     
+    # RAG ingest extraction models (structured extraction; small JSON-mode models suffice)
+    OPENAI_EXTRACT_MODEL: str = os.getenv("OPENAI_EXTRACT_MODEL", "gpt-4o-mini")
+    ANTHROPIC_EXTRACT_MODEL: str = os.getenv("ANTHROPIC_EXTRACT_MODEL", "claude-3-5-haiku-latest")
+    GROQ_EXTRACT_MODEL: str = os.getenv("GROQ_EXTRACT_MODEL", os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"))
+    
     # Application Settings
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
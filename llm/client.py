@@ -4,7 +4,8 @@ Use one via LLM_PROVIDER + API key (or Ollama with no key).
 """
 import os
 import re
-from typing import Iterator, Optional
+import threading
+from typing import Dict, Iterator, Optional, Tuple
 
 
 def extract_json(text: str) -> str:
@@ -47,6 +48,10 @@ class LLMClient:
             else:
                 self._impl = "ollama"
                 self._key = None
+        # Groq SDK client, created on first use and shared by every call (and thread)
+        # so HTTP connections are kept alive
+        self._groq_sdk = None
+        self._groq_lock = threading.Lock()
 
     @property
     def provider_name(self) -> str:
@@ -64,13 +69,19 @@ class LLMClient:
         return self._ollama(prompt, system_prompt, temperature)
 
     def generate_stream(
-        self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.5
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.5,
+        model: Optional[str] = None,
+        json_mode: bool = False,
     ) -> Iterator[str]:
         """
         Yield text chunks for streaming. Groq uses native streaming; Gemini/Ollama yield full text as one chunk.
+        model overrides GROQ_MODEL and json_mode requests a JSON object reply (Groq only).
         """
         if self._impl == "groq":
-            yield from self._groq_stream(prompt, system_prompt, temperature)
+            yield from self._groq_stream(prompt, system_prompt, temperature, model, json_mode)
         elif self._impl == "gemini":
             full = self._gemini(prompt, system_prompt, temperature)
             if full:
@@ -81,21 +92,27 @@ class LLMClient:
                 yield full
 
     def _groq_stream(
-        self, prompt: str, system_prompt: Optional[str], temperature: float
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        model: Optional[str] = None,
+        json_mode: bool = False,
     ) -> Iterator[str]:
         try:
-            from groq import Groq
-            client = Groq(api_key=self._key)
-            model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+            client = self._groq_client()
+            model = model or os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
             msgs = []
             if system_prompt:
                 msgs.append({"role": "system", "content": system_prompt})
             msgs.append({"role": "user", "content": prompt})
+            extra = {"response_format": {"type": "json_object"}} if json_mode else {}
             stream = client.chat.completions.create(
                 model=model,
                 messages=msgs,
                 temperature=temperature,
                 stream=True,
+                **extra,
             )
             for chunk in stream:
                 part = (chunk.choices[0].delta.content or "") if chunk.choices else ""
@@ -106,8 +123,7 @@ class LLMClient:
 
     def _groq(self, prompt: str, system_prompt: Optional[str], temperature: float) -> str:
         try:
-            from groq import Groq
-            client = Groq(api_key=self._key)
+            client = self._groq_client()
             model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
             msgs = []
             if system_prompt:
@@ -122,6 +138,15 @@ class LLMClient:
         except Exception as e:
             raise RuntimeError(f"Groq error: {e}") from e
     
+    def _groq_client(self):
+        """The shared Groq SDK client (created once; raises ImportError if groq is missing)."""
+        if self._groq_sdk is None:
+            with self._groq_lock:
+                if self._groq_sdk is None:
+                    from groq import Groq
+                    self._groq_sdk = Groq(api_key=self._key)
+        return self._groq_sdk
+    
     def _gemini(self, prompt: str, system_prompt: Optional[str], temperature: float) -> str:
         try:
             import google.generativeai as genai
@@ -159,7 +184,24 @@ def create_llm_client(provider: Optional[str] = None, api_key: Optional[str] = N
     """
     Create an LLM client if any provider is configured.
     Returns None if no key/provider set (use rule-based fallback).
+    Clients are cached per (provider, api_key), so every caller shares the same instance.
+    A None result is not cached, so a key or provider configured later is still picked up.
     """
+    key = (provider, api_key)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _build_llm_client(provider, api_key)
+            if client is not None:
+                _CLIENTS[key] = client
+    return client
+
+
+_CLIENTS: Dict[Tuple[Optional[str], Optional[str]], LLMClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _build_llm_client(provider: Optional[str], api_key: Optional[str]) -> Optional[LLMClient]:
     p = (provider or os.getenv("LLM_PROVIDER", "")).lower()
     if p == "ollama":
         return LLMClient(provider="ollama")
@@ -3,38 +3,346 @@ RAG Ingest - For importing yoga knowledge from external sources
 Supports: Text, JSON, PDF, URLs. Saves to data/yoga_knowledge.json so the app uses it.
 Long texts (e.g. ~100 A4 pages) are chunked and processed in passes, then merged.
 """
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import os
+import random
+import re
+import threading
+import time
 from pathlib import Path
 
-from .vector_store import VectorStore
-from .knowledge_io import save_knowledge_to_file, get_knowledge_path
+from .vector_store import UPSERT_BATCH, VectorStore
+from .knowledge_io import save_knowledge_to_file, get_knowledge_path, iter_entries_from_file
 
-# Max characters per LLM call; long docs are split into chunks of this size
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # stdlib fallback; orjson is 2-5x faster on large replies/files
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# Max characters per LLM call for extraction models missing from MODEL_CTX
 CHUNK_CHARS = 90_000
+# Context window (tokens) of known extraction models; chunks are sized to fill
+# CTX_FILL of it minus the reserved output tokens (see _target_chunk_chars)
+MODEL_CTX = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4": 8_192,
+    "claude-3-5-haiku-latest": 200_000,
+    "claude-3-5-sonnet-latest": 200_000,
+    "claude-3-opus-20240229": 200_000,
+    "llama-3.3-70b-versatile": 131_072,
+    "llama-3.1-8b-instant": 131_072,
+}
+CTX_FILL = 0.8
+EXTRACT_OUTPUT_TOKENS = 4000
+# Max tokens per extraction request (prompt plus reserved reply) by provider, so chunks stay
+# within common per-request / tokens-per-minute limits however large the context window is.
+# LLM_MAX_REQUEST_TOKENS overrides it for every provider (e.g. on higher rate-limit tiers).
+MAX_REQUEST_TOKENS = {"groq": 12_000, "openai": 30_000, "anthropic": 40_000}
+# Concurrent LLM calls per long document; keep low to stay under provider rate limits
+INGEST_WORKERS = 4
+# Chunk break points: paragraph, sentence end (CJK full stops need no trailing space), line
+_BREAK_RE = re.compile(r"\n\n|[.!?]\s|[。！？]|\n")
+_POSE_SEP_RE = re.compile(r"[\W_]+")
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+# Chunks of a long text with fewer than MIN_KEYWORD_HITS of these terms (copyright pages,
+# indexes, references, ads) are skipped without an LLM call. Matched lowercase, as substrings.
+YOGA_KEYWORDS = (
+    # practice
+    "yoga", "asana", "pranayama", "vinyasa", "mudra", "bandha", "chakra", "drishti", "mantra",
+    "meditat", "breath", "inhale", "exhale", "posture", "stretch", "alignment", "balance",
+    # anatomy
+    "spine", "pelvis", "hamstring", "hip", "shoulder", "knee", "core", "sacrum", "abdomen",
+    # pose names (EN / Sanskrit)
+    "downward dog", "child's pose", "cobra", "warrior", "triangle", "tree pose", "bridge",
+    "pigeon", "cat-cow", "plank", "forward fold", "twist", "backbend", "inversion", "savasana",
+    "tadasana", "balasana", "bhujangasana", "virabhadrasana", "trikonasana", "vrksasana",
+    "adho mukha", "uttanasana", "paschimottanasana", "sirsasana", "sarvangasana", "dhanurasana",
+    # philosophy
+    "sutra", "patanjali", "samadhi", "dharana", "dhyana", "pratyahara", "yama", "niyama",
+    "prana", "kosha", "ahimsa", "klesha", "vritti", "purusha", "prakriti",
+    # Chinese
+    "瑜伽", "体式", "呼吸", "冥想", "调息", "三摩地", "禅定", "脊柱", "伸展", "体位",
+)
+MIN_KEYWORD_HITS = 3
+# Parsed extraction results are cached on disk by content hash; bump the version
+# whenever prompts change so stale results are not reused. The cache lives next to the
+# knowledge file (not the working directory) unless RAG_EXTRACT_CACHE_DIR is set.
+EXTRACT_CACHE_VERSION = "v2"
+EXTRACT_CACHE_SUBDIR = "extract_cache"
+# JSON source files at least this large are streamed entry by entry with ijson (if installed)
+STREAM_JSON_BYTES = 16 * 1024 * 1024
+# Text files are read and extracted in paragraph-aligned sections of about this many chars
+TEXT_SECTION_CHARS = 1_000_000
+# LLM calls per minute across all extraction threads (provider RPM limit), and retries
+# with exponential backoff for rate-limit/transient errors
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_MAX_ATTEMPTS = 5
+LLM_BACKOFF_MAX_S = 60
+_RETRYABLE_ERRORS = {
+    "RateLimitError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "OverloadedError",
+    "ServiceUnavailableError",
+}
+# Batch API jobs (opt-in): give up and fall back to per-chunk calls after this long
+BATCH_TIMEOUT_S = 2 * 60 * 60
+# Providers with a batch path (the pinned groq SDK has no files/batches resources)
+_BATCH_PROVIDERS = ("openai", "anthropic")
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for `model` (o200k_base if unknown), loaded once; None without tiktoken."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:  # not installed, or encoding files unavailable offline
+        return None
+
+
+def _tokens_per_char(text: str, model: str) -> float:
+    """
+    Estimated tokens per character of `text`, measured on its first 4KB. Uses tiktoken when
+    installed (an approximation for non-OpenAI models); otherwise ~0.25 for Latin text and
+    ~1.0 for CJK, blended by the share of CJK characters in the sample.
+    """
+    sample = text[:4096]
+    if not sample:
+        return 0.25
+    enc = _encoding(model)
+    if enc is not None:
+        return max(len(enc.encode(sample)) / len(sample), 0.1)
+    cjk = len(_CJK_RE.findall(sample)) / len(sample)
+    return 0.25 + 0.75 * cjk
+
+
+def _max_request_tokens(provider: str) -> int:
+    """Token budget of one extraction request (see MAX_REQUEST_TOKENS)."""
+    override = os.getenv("LLM_MAX_REQUEST_TOKENS")
+    if override:
+        return int(override)
+    return MAX_REQUEST_TOKENS.get(provider, EXTRACT_OUTPUT_TOKENS + CHUNK_CHARS // 4)
+
+
+def _target_chunk_chars(provider: str, text: str) -> int:
+    """
+    Chunk size (chars) for one extraction request: the provider's request token budget, or
+    the model's context window if smaller, minus the tokens reserved for the reply.
+    """
+    model = _model_for(provider)
+    per_char = _tokens_per_char(text, model)
+    limit = _max_request_tokens(provider)
+    ctx = MODEL_CTX.get(model)
+    if ctx:
+        limit = min(limit, ctx * CTX_FILL)
+        return max(int((limit - EXTRACT_OUTPUT_TOKENS) / per_char), 1000)
+    return max(min(CHUNK_CHARS, int((limit - EXTRACT_OUTPUT_TOKENS) / per_char)), 1000)
+
+
+@functools.lru_cache(maxsize=1)
+def _keyword_matcher():
+    """Multi-pattern matcher over YOGA_KEYWORDS: Aho-Corasick automaton if pyahocorasick is installed, else one compiled regex."""
+    try:
+        import ahocorasick
+        automaton = ahocorasick.Automaton()
+        for kw in YOGA_KEYWORDS:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+        return automaton.iter
+    except ImportError:
+        pattern = re.compile("|".join(re.escape(kw) for kw in sorted(YOGA_KEYWORDS, key=len, reverse=True)))
+        return pattern.finditer
+
+
+def _has_yoga_signal(chunk: str, min_hits: int = MIN_KEYWORD_HITS) -> bool:
+    """True if the chunk contains at least `min_hits` yoga keyword occurrences (stops at the min_hits-th)."""
+    matches = _keyword_matcher()(chunk.lower())
+    return sum(1 for _ in itertools.islice(matches, min_hits)) >= min_hits
 
 
 def _chunk_text(text: str, size: int = CHUNK_CHARS) -> List[str]:
-    """Split text into chunks of at most `size` chars, breaking at paragraph or line when possible."""
+    """Split text into chunks of at most `size` chars, breaking at paragraph, sentence or line when possible."""
     if len(text) <= size:
         return [text] if text.strip() else []
     chunks = []
+    n = len(text)
     start = 0
-    while start < len(text):
-        end = min(start + size, len(text))
-        slice_ = text[start:end]
-        # Prefer break at double newline (paragraph), then single newline
-        if end < len(text):
-            last_para = slice_.rfind("\n\n")
-            last_line = slice_.rfind("\n")
-            break_at = last_para if last_para > size // 2 else (last_line if last_line > size // 2 else -1)
-            if break_at >= 0:
-                slice_ = text[start : start + break_at + 1]
-                end = start + break_at + 1
-        chunks.append(slice_.strip())
+    while start < n:
+        end = min(start + size, n)
+        # Break after the last paragraph/sentence/line boundary in the back half of the
+        # window: one pass of the compiled regex, no substring copy of the window
+        if end < n:
+            m = None
+            for m in _BREAK_RE.finditer(text, start + size // 2, end):
+                pass
+            if m:
+                end = m.end()
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
         start = end
-    return [c for c in chunks if c]
+    return chunks
+
+
+# Static prompt pieces, keyed by source_is_philosophy; a call's prompt is prefix + text + suffix
+_PHILOSOPHY_PROMPT_PREFIX = """The following text is yoga philosophy (瑜伽经 / Yoga Sutras), NOT physical asana. Extract by topic/sutra/chapter. Return a JSON array. Each entry: "pose" = topic id (e.g. sutra_1_1, sutra_samadhi), "alignment" = key concepts or [], "contraindications" = [], "benefits" = main teachings, "breathing" = pranayama/meditation where relevant, "modifications" = "".
+
+Text:
+"""
+_ASANA_PROMPT_PREFIX = """Extract yoga pose knowledge from the following text and return as JSON array.
+Each entry should have: pose, alignment (array), contraindications (array), benefits (array), breathing (string), modifications (string).
+
+Text:
+"""
+_PROMPT_PREFIX = {True: _PHILOSOPHY_PROMPT_PREFIX, False: _ASANA_PROMPT_PREFIX}
+# Single-chunk replies wrap the array as {"entries": [...]} so provider JSON mode (object-only) applies
+_ENTRIES_RULE = 'Return only a valid JSON object of the form {"entries": [...]} holding the array, no other text.'
+_PROMPT_SUFFIX = "\n\n" + _ENTRIES_RULE
+
+_GROQ_PHILOSOPHY_SYSTEM = """You are extracting from yoga philosophy (瑜伽经 / Yoga Sutras), NOT physical asana. 
+Use "pose" as a topic/sutra id (e.g. sutra_1_1, sutra_samadhi, sutra_2_1). 
+Put main teachings in "benefits", pranayama/meditation in "breathing", key concepts in "alignment". 
+Use "contraindications" = [], "modifications" = "" where not applicable. 
+"""
+_GROQ_ASANA_SYSTEM = """You are a yoga knowledge extractor. Extract structured entries from the given text.
+Use pose, alignment (array), contraindications (array), benefits (array), breathing (string), modifications (string).
+"""
+_GROQ_OUTPUT_RULE = 'Output only a JSON object {"entries": [...]} holding the array of objects, no other text.'
+_GROQ_SYSTEM = {
+    True: _GROQ_PHILOSOPHY_SYSTEM + _GROQ_OUTPUT_RULE,
+    False: _GROQ_ASANA_SYSTEM + _GROQ_OUTPUT_RULE,
+}
+_GROQ_PROMPT_PREFIX = {
+    True: """The following is yoga philosophy (瑜伽经), not asana. Extract by topic/sutra. Return a JSON array. Each entry: "pose" (topic id, e.g. sutra_1_1), "alignment" (array, key concepts or []), "contraindications" ([]), "benefits" (array, main teachings), "breathing" (string, pranayama/meditation or ""), "modifications" ("").
+
+Text:
+""",
+    False: """Extract yoga-related knowledge from the following text. Return a JSON array of entries. Each entry must have: "pose" (string), "alignment" (array), "contraindications" (array), "benefits" (array), "breathing" (string), "modifications" (string). Use empty arrays/strings when not applicable.
+
+Text:
+""",
+}
+_GROQ_PROMPT_SUFFIX = "\n\n" + _ENTRIES_RULE
+
+
+def _extraction_prompt(text: str, source_is_philosophy: bool) -> str:
+    """User prompt for OpenAI/Anthropic extraction (JSON array of entries)."""
+    return _PROMPT_PREFIX[bool(source_is_philosophy)] + text + _PROMPT_SUFFIX
+
+
+def _groq_prompts(text: str, source_is_philosophy: bool) -> tuple:
+    """(system, user) prompts for Groq extraction (JSON array of entries)."""
+    sp = bool(source_is_philosophy)
+    return _GROQ_SYSTEM[sp], _GROQ_PROMPT_PREFIX[sp] + text + _GROQ_PROMPT_SUFFIX
+
+
+def _norm_pose(pose: str) -> str:
+    """Dedupe key for a pose name: "Child Pose", "child_pose" and "child-pose" all map to "child_pose"."""
+    return _POSE_SEP_RE.sub("_", pose.lower()).strip("_") or pose
+
+
+def _model_for(provider: str) -> str:
+    """Model used for extraction by each provider (Config.*_EXTRACT_MODEL)."""
+    from config import Config
+
+    if provider == "openai":
+        return Config.OPENAI_EXTRACT_MODEL
+    if provider == "anthropic":
+        return Config.ANTHROPIC_EXTRACT_MODEL
+    return Config.GROQ_EXTRACT_MODEL
+
+
+def _cache_path(provider: str, text: str, source_is_philosophy: bool) -> Path:
+    """Cache file for one extraction call, keyed by provider, model, prompt version and text."""
+    # "False" fills the slot of the removed multi-chunk flag, so existing cache files still match
+    raw = f"{provider}|{_model_for(provider)}|{EXTRACT_CACHE_VERSION}|{source_is_philosophy}|False|{text}"
+    key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    cache_dir = os.getenv("RAG_EXTRACT_CACHE_DIR")
+    base = Path(cache_dir) if cache_dir else get_knowledge_path().parent / EXTRACT_CACHE_SUBDIR
+    return base / f"{key}.json"
+
+
+def _cache_load(path: Path) -> Optional[List[Dict]]:
+    """Cached entries for this call, or None on miss/unreadable file."""
+    try:
+        with open(path, "rb") as f:
+            data = _loads(f.read())
+        return data if isinstance(data, list) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_store(path: Path, entries: List[Dict]) -> None:
+    """Write entries atomically (tmp file + rename) so a crash never leaves a partial cache file."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_dumps(entries))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write extraction cache: {e}")
+
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def _loads_lenient(text: str):
+    """_loads, retried without trailing commas (",]" / ",}"), which LLMs commonly emit."""
+    try:
+        return _loads(text)
+    except ValueError:
+        fixed = _TRAILING_COMMA_RE.sub(r"\1", text)
+        if fixed == text:
+            raise
+        return _loads(fixed)
+
+
+def _parse_entries(raw: str) -> List[Dict]:
+    """
+    Parse an LLM reply (optionally fenced in markdown) into a list of entries.
+    The reply is {"entries": [...]} (a bare array is accepted too).
+    """
+    from llm.client import extract_json
+
+    body = extract_json(raw)
+    try:
+        result = _loads_lenient(body)
+    except ValueError:
+        # Stray text around the JSON or a truncated reply: keep every complete entry object
+        salvaged = list(_scan_entries([body]))
+        if not salvaged:
+            raise
+        return salvaged
+    if isinstance(result, dict) and isinstance(result.get("entries"), list):
+        return result["entries"]
+    if not isinstance(result, list):
+        result = [result] if isinstance(result, dict) else []
+    return result
 
 
 def ingest_from_json(
@@ -65,14 +373,28 @@ def ingest_from_json(
     ]
     """
     try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        entries = data if isinstance(data, list) else data.get("entries", [])
-        
-        if vector_store:
-            for entry in entries:
-                vector_store.add_knowledge(entry)
+        entries = None
+        if os.path.getsize(json_path) >= STREAM_JSON_BYTES:
+            # Large dump: never hold the raw file or its full parse tree in memory at once
+            try:
+                entries = []
+                with open(json_path, "rb") as f:
+                    for entry in iter_entries_from_file(f):
+                        entries.append(entry)
+                        if vector_store and len(entries) % UPSERT_BATCH == 0:
+                            vector_store.add_knowledge_batch(entries[-UPSERT_BATCH:])
+                if vector_store and len(entries) % UPSERT_BATCH:
+                    vector_store.add_knowledge_batch(entries[-(len(entries) % UPSERT_BATCH):])
+            except ImportError:
+                entries = None
+        if entries is None:
+            with open(json_path, "rb") as f:
+                data = _loads(f.read())
+            
+            entries = data if isinstance(data, list) else data.get("entries", [])
+            
+            if vector_store:
+                vector_store.add_knowledge_batch(entries)
         if save_to_rag and entries:
             n = save_knowledge_to_file(entries, get_knowledge_path(), merge=True)
             print(f"✓ Saved {n} entries to RAG knowledge file")
@@ -88,7 +410,11 @@ def ingest_from_text(
     text: str,
     vector_store: Optional[VectorStore] = None,
     save_to_rag: bool = True,
-    source_is_philosophy: bool = False
+    source_is_philosophy: bool = False,
+    max_workers: int = INGEST_WORKERS,
+    use_batch_api: bool = False,
+    use_cache: bool = True,
+    skip_irrelevant: bool = True
 ) -> List[Dict]:
     """
     Ingest yoga knowledge from text source (supports long texts, e.g. ~100 A4 pages).
@@ -102,231 +428,643 @@ def ingest_from_text(
         text: Text content to ingest
         vector_store: Optional vector store to save to
         source_is_philosophy: If True, treat text as yoga philosophy (e.g. 瑜伽经), not physical asana
+        max_workers: Max chunks extracted concurrently (long texts only)
+        use_batch_api: If True, submit all chunks of a long text as one provider batch job
+                       (cheaper, slower; offline ingestion only; OpenAI and Anthropic). Falls
+                       back to per-chunk calls if the batch fails or exceeds BATCH_TIMEOUT_S;
+                       Groq always uses per-chunk calls (the pinned groq SDK has no batch API).
+        use_cache: If True, reuse parsed results of identical earlier LLM calls from
+                   extract_cache/ beside the knowledge file (or RAG_EXTRACT_CACHE_DIR) instead
+                   of calling the LLM again
+        skip_irrelevant: If True, chunks of a long text with no yoga keywords (see
+                         YOGA_KEYWORDS) are skipped without an LLM call
     
     Returns:
         List of structured knowledge entries
     """
     try:
-        from config import Config
-        
-        def pick_extractor():
-            extra = {"source_is_philosophy": source_is_philosophy}
-            provider = (Config.LLM_PROVIDER or "").lower()
-            # Respect LLM_PROVIDER so Groq is used when set (e.g. LLM_PROVIDER=groq + GROQ_API_KEY)
-            if provider == "groq" and Config.GROQ_API_KEY:
-                return lambda t, vs, sr: _extract_with_groq(t, vs, sr, **extra)
-            if provider == "openai" and Config.OPENAI_API_KEY:
-                return lambda t, vs, sr: _extract_with_openai(t, vs, sr, **extra)
-            if provider == "anthropic" and Config.ANTHROPIC_API_KEY:
-                return lambda t, vs, sr: _extract_with_anthropic(t, vs, sr, **extra)
-            # Fallback: use first available key (same order as before)
-            if Config.OPENAI_API_KEY:
-                return lambda t, vs, sr: _extract_with_openai(t, vs, sr, **extra)
-            if Config.ANTHROPIC_API_KEY:
-                return lambda t, vs, sr: _extract_with_anthropic(t, vs, sr, **extra)
-            if Config.GROQ_API_KEY:
-                return lambda t, vs, sr: _extract_with_groq(t, vs, sr, **extra)
-            return None
-        
-        extractor = pick_extractor()
-        if not extractor:
+        provider = _pick_provider()
+        if not provider:
             print("Warning: No LLM API key found (set GROQ_API_KEY, OPENAI_API_KEY, or ANTHROPIC_API_KEY).")
             return []
+        extract = _EXTRACTORS[provider]
+        client = _make_client(provider)
+
+        # Extractors never save; the knowledge file is written once below
+        def extractor(t: str, vs: Optional[VectorStore], quiet: bool = False) -> List[Dict]:
+            cache_path = _cache_path(provider, t, source_is_philosophy) if use_cache else None
+            cached = _cache_load(cache_path) if cache_path else None
+            if cached is None:
+                entries = extract(
+                    t, vs, False, source_is_philosophy=source_is_philosophy, client=client, quiet=quiet
+                )
+                # Only complete replies are cached; a truncated one is retried next time
+                if cache_path and entries and not isinstance(entries, _PartialEntries):
+                    _cache_store(cache_path, entries)
+                return entries
+            if not quiet:
+                print(f"✓ Reused {len(cached)} cached entries")
+            if vs:
+                vs.add_knowledge_batch([e for e in cached if isinstance(e, dict) and e.get("pose")])
+            return cached
         
-        # Long text: chunk, extract per chunk, merge and save once
-        if len(text.strip()) > CHUNK_CHARS:
-            chunks = _chunk_text(text.strip(), CHUNK_CHARS)
+        # Long text: chunk to the model's context, extract per chunk, merge and save once
+        chunk_chars = _target_chunk_chars(provider, text)
+        if len(text.strip()) > chunk_chars:
+            chunks = _chunk_text(text.strip(), chunk_chars)
             print(f"Long text ({len(text):,} chars) → {len(chunks)} chunks" + (" [philosophy]" if source_is_philosophy else ""))
-            all_entries: List[Dict] = []
-            seen_poses: set = set()  # dedupe by pose
-            for i, chunk in enumerate(chunks):
-                print(f"  Chunk {i + 1}/{len(chunks)} ({len(chunk):,} chars)...")
-                entries = extractor(chunk, vector_store, save_to_rag=False)
+            if skip_irrelevant:
+                kept = [c for c in chunks if _has_yoga_signal(c)]
+                if len(kept) < len(chunks):
+                    print(f"  Skipping {len(chunks) - len(kept)} chunk(s) with no yoga keywords")
+                chunks = kept
+            results: Optional[List[List[Dict]]] = None
+            if use_batch_api and len(chunks) > 1:
+                if provider in _BATCH_PROVIDERS:
+                    results = _extract_batch(provider, chunks, source_is_philosophy)
+                    if results is None:
+                        print("  Batch API unavailable or timed out; falling back to per-chunk calls")
+                else:
+                    print(f"  No batch API for {provider}; using per-chunk calls")
+            if results is None:
+                # Chunks are independent network-bound LLM calls, so extract them concurrently,
+                # then dedupe and write to the vector store here, in chunk order. Workers stay
+                # quiet; progress is reported from this thread only.
+                results = [[] for _ in chunks]
+                pbar = _progress_bar(len(chunks), "Extracting")
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as ex:
+                    futures = {ex.submit(extractor, c, None, True): i for i, c in enumerate(chunks)}
+                    for fut in as_completed(futures):
+                        i = futures[fut]
+                        results[i] = fut.result()
+                        if pbar is not None:
+                            pbar.update(1)
+                            pbar.set_postfix(entries=sum(len(r) for r in results))
+                        else:
+                            print(f"  Chunk {i + 1}/{len(chunks)} → {len(results[i])} entries")
+                if pbar is not None:
+                    pbar.close()
+            by_key: Dict[str, Dict] = {}  # dedupe by normalized pose, first chunk wins
+            for entries in results:
                 for e in entries:
-                    if isinstance(e, dict) and e.get("pose") and e["pose"] not in seen_poses:
-                        seen_poses.add(e["pose"])
-                        all_entries.append(e)
+                    if isinstance(e, dict) and e.get("pose"):
+                        by_key.setdefault(_norm_pose(str(e["pose"])), e)
+            all_entries = list(by_key.values())
+            if vector_store:
+                vector_store.add_knowledge_batch(all_entries)
             if save_to_rag and all_entries:
                 n = save_knowledge_to_file(all_entries, get_knowledge_path(), merge=True)
                 print(f"✓ Saved {n} entries from {len(chunks)} chunks")
             return all_entries
         
-        return extractor(text, vector_store, save_to_rag)
+        entries = extractor(text, vector_store)
+        if save_to_rag and entries:
+            n = save_knowledge_to_file(entries, get_knowledge_path(), merge=True)
+            print(f"✓ Saved {n} entries to RAG knowledge file")
+        return entries
     except Exception as e:
         print(f"Error ingesting from text: {e}")
         return []
 
 
-def _extract_with_openai(
-    text: str,
-    vector_store: Optional[VectorStore],
-    save_to_rag: bool = True,
-    source_is_philosophy: bool = False
-) -> List[Dict]:
-    """Extract knowledge using OpenAI."""
+def _progress_bar(total: int, desc: str):
+    """tqdm progress bar if installed, else None (callers print one line per step instead)."""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        if source_is_philosophy:
-            prompt = f"""The following text is yoga philosophy (瑜伽经 / Yoga Sutras), NOT physical asana. Extract by topic/sutra/chapter. Return a JSON array. Each entry: "pose" = topic id (e.g. sutra_1_1, sutra_samadhi), "alignment" = key concepts or [], "contraindications" = [], "benefits" = main teachings, "breathing" = pranayama/meditation where relevant, "modifications" = "".
+        from tqdm import tqdm
+    except ImportError:
+        return None
+    return tqdm(total=total, desc=desc, unit="call")
 
-Text:
-{text}
 
-Return only valid JSON array, no other text."""
-        else:
-            prompt = f"""Extract yoga pose knowledge from the following text and return as JSON array.
-Each entry should have: pose, alignment (array), contraindications (array), benefits (array), breathing (string), modifications (string).
+def _pick_provider() -> Optional[str]:
+    """Extraction provider ("groq", "openai", "anthropic") from config, or None if no key is set."""
+    from config import Config
 
-Text:
-{text}
+    provider = (Config.LLM_PROVIDER or "").lower()
+    # Respect LLM_PROVIDER so Groq is used when set (e.g. LLM_PROVIDER=groq + GROQ_API_KEY)
+    if provider == "groq" and Config.GROQ_API_KEY:
+        return "groq"
+    if provider == "openai" and Config.OPENAI_API_KEY:
+        return "openai"
+    if provider == "anthropic" and Config.ANTHROPIC_API_KEY:
+        return "anthropic"
+    # Fallback: use first available key (same order as before)
+    if Config.OPENAI_API_KEY:
+        return "openai"
+    if Config.ANTHROPIC_API_KEY:
+        return "anthropic"
+    if Config.GROQ_API_KEY:
+        return "groq"
+    return None
 
-Return only valid JSON array, no other text."""
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        if vector_store:
-            for entry in result:
+
+def _scan_entries(deltas: Iterable[str]) -> Iterator[Dict]:
+    """
+    Bracket-balanced scanner over (streamed) JSON text: yield each entry object as soon as its
+    closing brace arrives. Entries are objects inside the array(s) of the top-level object
+    ({"entries": [...]}), or of a bare top-level array. Text outside the
+    JSON (e.g. markdown fences) is skipped, and a truncated tail only loses the open entry.
+    """
+    stack: List[str] = []
+    in_str = escaped = False
+    entry_depth: Optional[int] = None  # stack depth at which the current entry started
+    cur: List[str] = []
+    for delta in deltas:
+        for ch in delta:
+            if entry_depth is not None:
+                cur.append(ch)
+            if in_str:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_str = False
+            elif ch == '"':
+                in_str = True
+            elif ch == "[" or ch == "{":
+                if ch == "{" and entry_depth is None and (stack == ["{", "["] or stack == ["["]):
+                    entry_depth = len(stack)
+                    cur = ["{"]
+                stack.append(ch)
+            elif ch == "]" or ch == "}":
+                if stack:
+                    stack.pop()
+                if entry_depth is not None and len(stack) == entry_depth:
+                    try:
+                        entry = _loads_lenient("".join(cur))
+                    except ValueError:
+                        entry = None
+                    entry_depth = None
+                    cur = []
+                    if isinstance(entry, dict):
+                        yield entry
+
+
+def _iter_json_entries(deltas: Iterable[str]) -> Iterator[Dict]:
+    """
+    Incrementally parse a streamed JSON reply with _scan_entries. If nothing could be
+    streamed, the full reply is parsed with _parse_entries instead.
+    """
+    full: List[str] = []
+
+    def recorded() -> Iterator[str]:
+        for delta in deltas:
+            full.append(delta)
+            yield delta
+
+    yielded = False
+    for entry in _scan_entries(recorded()):
+        yielded = True
+        yield entry
+    if not yielded:
+        for entry in _parse_entries("".join(full)):
+            if isinstance(entry, dict):
+                yield entry
+
+
+def _make_client(provider: str):
+    """
+    SDK client for one ingestion, shared by all its extraction calls (and threads) so HTTP
+    connections are kept alive. None if the SDK is missing (the call then reports the error).
+    """
+    try:
+        if provider == "openai":
+            from openai import OpenAI
+            return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        if provider == "anthropic":
+            import anthropic
+            return anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        from llm.client import create_llm_client
+        return create_llm_client()
+    except ImportError:
+        return None
+
+
+class _RateLimiter:
+    """Sliding-window limiter shared by all extraction threads: at most `rpm` calls per minute."""
+
+    def __init__(self, rpm: int):
+        self.rpm = max(1, rpm)
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until another call fits in the current 60s window, then record it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) < self.rpm:
+                    self._calls.append(now)
+                    return
+                wait = 60 - (now - self._calls[0])
+            time.sleep(wait)
+
+
+_limiter = _RateLimiter(LLM_RPM)
+
+
+def _is_retryable(e: Optional[BaseException]) -> bool:
+    """Rate limit, timeout, connection or 5xx error (also when wrapped, e.g. by llm.client)."""
+    while e is not None:
+        status = getattr(e, "status_code", None)
+        if status in (408, 409, 429) or (isinstance(status, int) and status >= 500):
+            return True
+        if type(e).__name__ in _RETRYABLE_ERRORS:
+            return True
+        e = e.__cause__
+    return False
+
+
+def _with_retries(make_deltas: Callable[[], Iterator[str]]) -> Iterator[str]:
+    """
+    Start a streamed LLM call under the rate limiter, retrying with exponential backoff
+    (1s doubling up to LLM_BACKOFF_MAX_S, with jitter) on retryable errors raised before
+    the first delta. Errors after the reply has started are not retried, since its
+    entries may already be in the vector store.
+    """
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        _limiter.acquire()
+        deltas = make_deltas()
+        try:
+            first = next(deltas, None)
+        except Exception as e:
+            if attempt == LLM_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            delay = min(LLM_BACKOFF_MAX_S, 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"  LLM call failed ({e}); retry {attempt + 1}/{LLM_MAX_ATTEMPTS - 1} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if first is not None:
+            yield first
+        yield from deltas
+        return
+
+
+def _openai_deltas(text: str, source_is_philosophy: bool, client=None) -> Iterator[str]:
+    """Stream the OpenAI extraction reply as text deltas."""
+    client = client or _make_client("openai")
+    if client is None:
+        raise ImportError("openai not installed. Install with: pip install openai")
+    stream = client.chat.completions.create(
+        model=_model_for("openai"),
+        messages=[{"role": "user", "content": _extraction_prompt(text, source_is_philosophy)}],
+        temperature=0.3,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+    for chunk in stream:
+        part = (chunk.choices[0].delta.content or "") if chunk.choices else ""
+        if part:
+            yield part
+
+
+def _anthropic_deltas(text: str, source_is_philosophy: bool, client=None) -> Iterator[str]:
+    """Stream the Anthropic extraction reply as text deltas (prefilled with "{" to force a JSON object)."""
+    client = client or _make_client("anthropic")
+    if client is None:
+        raise ImportError("anthropic not installed. Install with: pip install anthropic")
+    with client.messages.stream(
+        model=_model_for("anthropic"),
+        max_tokens=EXTRACT_OUTPUT_TOKENS,
+        messages=[
+            {"role": "user", "content": _extraction_prompt(text, source_is_philosophy)},
+            {"role": "assistant", "content": "{"},
+        ],
+    ) as stream:
+        yield "{"
+        yield from stream.text_stream
+
+
+def _groq_deltas(text: str, source_is_philosophy: bool, client=None) -> Iterator[str]:
+    """Stream the Groq extraction reply as text deltas (uses llm.client)."""
+    client = client or _make_client("groq")
+    if not client:
+        raise RuntimeError("Groq client not available. Set GROQ_API_KEY and optionally LLM_PROVIDER=groq.")
+    system, prompt = _groq_prompts(text, source_is_philosophy)
+    yield from client.generate_stream(
+        prompt, system_prompt=system, temperature=0.3, model=_model_for("groq"), json_mode=True
+    )
+
+
+class _PartialEntries(list):
+    """Entries salvaged from a reply that failed mid-stream (kept, but never cached)."""
+
+
+def _extract_streaming(
+    label: str,
+    deltas: Iterator[str],
+    vector_store: Optional[VectorStore],
+    save_to_rag: bool,
+    quiet: bool = False
+) -> List[Dict]:
+    """
+    Consume a streamed extraction reply: each entry goes to the vector store as soon as
+    it is parsed, so indexing overlaps generation. Entries parsed before an error are kept
+    and returned as _PartialEntries, so callers can tell an incomplete reply from a full one.
+    With quiet, only errors are printed (chunked ingestion reports progress itself).
+    """
+    result: List[Dict] = []
+    try:
+        for entry in _iter_json_entries(deltas):
+            result.append(entry)
+            if vector_store and entry.get("pose"):
                 vector_store.add_knowledge(entry)
-        if save_to_rag and result:
-            n = save_knowledge_to_file(result, get_knowledge_path(), merge=True)
-            print(f"✓ Saved {n} entries to RAG knowledge file")
-        
-        print(f"✓ Extracted {len(result)} entries using OpenAI")
-        return result
+    except ValueError as e:
+        print(f"Error parsing {label} JSON: {e}")
+        result = _PartialEntries(result)
     except Exception as e:
-        print(f"Error extracting with OpenAI: {e}")
-        return []
+        print(f"Error extracting with {label}: {e}")
+        result = _PartialEntries(result)
+    if save_to_rag and result:
+        n = save_knowledge_to_file(result, get_knowledge_path(), merge=True)
+        print(f"✓ Saved {n} entries to RAG knowledge file")
+    if result and not quiet:
+        print(f"✓ Extracted {len(result)} entries using {label}")
+    return result
 
 
-def _extract_with_anthropic(
+def _extract_with_openai(
     text: str,
     vector_store: Optional[VectorStore],
     save_to_rag: bool = True,
-    source_is_philosophy: bool = False
+    source_is_philosophy: bool = False,
+    client=None,
+    quiet: bool = False
 ) -> List[Dict]:
-    """Extract knowledge using Anthropic."""
-    try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        
-        if source_is_philosophy:
-            prompt = f"""The following text is yoga philosophy (瑜伽经 / Yoga Sutras), NOT physical asana. Extract by topic/sutra/chapter. Return a JSON array. Each entry: "pose" = topic id (e.g. sutra_1_1, sutra_samadhi), "alignment" = key concepts or [], "contraindications" = [], "benefits" = main teachings, "breathing" = pranayama/meditation where relevant, "modifications" = "".
-
-Text:
-{text}
-
-Return only valid JSON array, no other text."""
-        else:
-            prompt = f"""Extract yoga pose knowledge from the following text and return as JSON array.
-Each entry should have: pose, alignment (array), contraindications (array), benefits (array), breathing (string), modifications (string).
+    """Extract knowledge using OpenAI (streamed)."""
+    deltas = _with_retries(lambda: _openai_deltas(text, source_is_philosophy, client))
+    return _extract_streaming("OpenAI", deltas, vector_store, save_to_rag, quiet)
 
-Text:
-{text}
 
-Return only valid JSON array, no other text."""
-        
-        response = client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        result = json.loads(response.content[0].text)
-        
-        if vector_store:
-            for entry in result:
-                vector_store.add_knowledge(entry)
-        if save_to_rag and result:
-            n = save_knowledge_to_file(result, get_knowledge_path(), merge=True)
-            print(f"✓ Saved {n} entries to RAG knowledge file")
-        
-        print(f"✓ Extracted {len(result)} entries using Anthropic")
-        return result
-    except Exception as e:
-        print(f"Error extracting with Anthropic: {e}")
-        return []
+def _extract_with_anthropic(
+    text: str,
+    vector_store: Optional[VectorStore],
+    save_to_rag: bool = True,
+    source_is_philosophy: bool = False,
+    client=None,
+    quiet: bool = False
+) -> List[Dict]:
+    """Extract knowledge using Anthropic (streamed)."""
+    deltas = _with_retries(lambda: _anthropic_deltas(text, source_is_philosophy, client))
+    return _extract_streaming("Anthropic", deltas, vector_store, save_to_rag, quiet)
 
 
 def _extract_with_groq(
     text: str,
     vector_store: Optional[VectorStore],
     save_to_rag: bool = True,
-    source_is_philosophy: bool = False
+    source_is_philosophy: bool = False,
+    client=None,
+    quiet: bool = False
 ) -> List[Dict]:
-    """Extract knowledge using Groq (uses llm.client)."""
-    try:
-        from llm.client import create_llm_client, extract_json
-        
-        client = create_llm_client()
-        if not client:
-            print("Warning: Groq client not available. Set GROQ_API_KEY and optionally LLM_PROVIDER=groq.")
-            return []
-        
-        # Truncate if very long so we stay within context (Groq models have limits)
-        max_chars = 120_000
-        if len(text) > max_chars:
-            text = text[:max_chars] + "\n\n[... text truncated for extraction ...]"
-        
-        if source_is_philosophy:
-            system = """You are extracting from yoga philosophy (瑜伽经 / Yoga Sutras), NOT physical asana. 
-Use "pose" as a topic/sutra id (e.g. sutra_1_1, sutra_samadhi, sutra_2_1). 
-Put main teachings in "benefits", pranayama/meditation in "breathing", key concepts in "alignment". 
-Use "contraindications" = [], "modifications" = "" where not applicable. 
-Output only a JSON array of objects, no other text."""
-            prompt = f"""The following is yoga philosophy (瑜伽经), not asana. Extract by topic/sutra. Return a JSON array. Each entry: "pose" (topic id, e.g. sutra_1_1), "alignment" (array, key concepts or []), "contraindications" ([]), "benefits" (array, main teachings), "breathing" (string, pranayama/meditation or ""), "modifications" ("").
+    """Extract knowledge using Groq (uses llm.client, streamed)."""
+    deltas = _with_retries(lambda: _groq_deltas(text, source_is_philosophy, client))
+    return _extract_streaming("Groq", deltas, vector_store, save_to_rag, quiet)
 
-Text:
-{text}
 
-Return only a valid JSON array, no markdown or extra text."""
-        else:
-            system = """You are a yoga knowledge extractor. Extract structured entries from the given text.
-Use pose, alignment (array), contraindications (array), benefits (array), breathing (string), modifications (string).
-Output only a JSON array of objects, no other text."""
-            prompt = f"""Extract yoga-related knowledge from the following text. Return a JSON array of entries. Each entry must have: "pose" (string), "alignment" (array), "contraindications" (array), "benefits" (array), "breathing" (string), "modifications" (string). Use empty arrays/strings when not applicable.
+def stream_entries_from_text(text: str, source_is_philosophy: bool = False) -> Iterator[Dict]:
+    """
+    Yield knowledge entries from a (single-chunk) text as the LLM generates them.
+    Nothing is saved; callers consume and store entries incrementally.
+    """
+    provider = _pick_provider()
+    if not provider:
+        return
+    deltas = _with_retries(lambda: _DELTA_STREAMS[provider](text, source_is_philosophy))
+    yield from _iter_json_entries(deltas)
 
-Text:
-{text}
 
-Return only a valid JSON array, no markdown or extra text."""
-        
-        raw = client.generate(prompt, system_prompt=system, temperature=0.3)
-        out = extract_json(raw)
-        result = json.loads(out)
-        if not isinstance(result, list):
-            result = [result] if isinstance(result, dict) else []
-        
-        if vector_store:
-            for entry in result:
-                if isinstance(entry, dict) and entry.get("pose"):
-                    vector_store.add_knowledge(entry)
-        if save_to_rag and result:
-            n = save_knowledge_to_file(result, get_knowledge_path(), merge=True)
-            print(f"✓ Saved {n} entries to RAG knowledge file")
-        
-        print(f"✓ Extracted {len(result)} entries using Groq")
-        return result
-    except json.JSONDecodeError as e:
-        print(f"Error parsing Groq JSON: {e}")
-        return []
+def _extract_batch(provider: str, chunks: List[str], source_is_philosophy: bool) -> Optional[List[List[Dict]]]:
+    """
+    Extract all chunks in one provider batch job (OpenAI Batch, Anthropic Message Batches).
+    Returns one entry list per chunk, or None if the provider has no batch support here, or
+    the job could not be submitted, failed, or did not finish within BATCH_TIMEOUT_S
+    (caller falls back to sync).
+    """
+    try:
+        if provider == "openai":
+            from openai import OpenAI
+            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            bodies = [
+                {
+                    "model": _model_for("openai"),
+                    "messages": [{"role": "user", "content": _extraction_prompt(c, source_is_philosophy)}],
+                    "temperature": 0.3,
+                    "response_format": {"type": "json_object"},
+                }
+                for c in chunks
+            ]
+            return _run_openai_style_batch(client, bodies)
+        if provider == "anthropic":
+            return _run_anthropic_batch(chunks, source_is_philosophy)
     except Exception as e:
-        print(f"Error extracting with Groq: {e}")
-        return []
+        print(f"Error running {provider} batch: {e}")
+    return None
+
+
+def _wait_for_batch(retrieve, is_done, timeout: float = BATCH_TIMEOUT_S):
+    """Poll retrieve() with exponential backoff until is_done(batch); None on timeout."""
+    deadline = time.monotonic() + timeout
+    delay = 5.0
+    while True:
+        batch = retrieve()
+        if is_done(batch):
+            return batch
+        if time.monotonic() + delay > deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 300.0)
+
+
+def _run_openai_style_batch(client, bodies: List[Dict]) -> Optional[List[List[Dict]]]:
+    """Upload a JSONL of chat requests, run it through /v1/batches and parse the output file."""
+    lines = [
+        _dumps({"custom_id": f"chunk_{i}", "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for i, body in enumerate(bodies)
+    ]
+    batch_file = client.files.create(file=("chunks.jsonl", b"\n".join(lines)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"  Submitted batch {batch.id} ({len(bodies)} chunks)")
+    done = _wait_for_batch(
+        lambda: client.batches.retrieve(batch.id),
+        lambda b: b.status in ("completed", "failed", "expired", "cancelled"),
+    )
+    if done is None:
+        client.batches.cancel(batch.id)
+        return None
+    if done.status != "completed" or not done.output_file_id:
+        print(f"  Batch {batch.id} ended with status {done.status}")
+        return None
+
+    results: List[List[Dict]] = [[] for _ in bodies]
+    for line in client.files.content(done.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = _loads(line)
+        i = int(row["custom_id"].rsplit("_", 1)[1])
+        try:
+            content = row["response"]["body"]["choices"][0]["message"]["content"]
+            results[i] = _parse_entries(content or "")
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            print(f"  Chunk {i + 1}: could not parse batch result ({e})")
+    return results
+
+
+def _run_anthropic_batch(chunks: List[str], source_is_philosophy: bool) -> Optional[List[List[Dict]]]:
+    """Run all chunks through the Anthropic Message Batches API."""
+    import anthropic
+    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    batch = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": f"chunk_{i}",
+                "params": {
+                    "model": _model_for("anthropic"),
+                    "max_tokens": EXTRACT_OUTPUT_TOKENS,
+                    "messages": [
+                        {"role": "user", "content": _extraction_prompt(c, source_is_philosophy)},
+                        {"role": "assistant", "content": "{"},
+                    ],
+                },
+            }
+            for i, c in enumerate(chunks)
+        ]
+    )
+    print(f"  Submitted batch {batch.id} ({len(chunks)} chunks)")
+    done = _wait_for_batch(
+        lambda: client.messages.batches.retrieve(batch.id),
+        lambda b: b.processing_status == "ended",
+    )
+    if done is None:
+        client.messages.batches.cancel(batch.id)
+        return None
+
+    results: List[List[Dict]] = [[] for _ in chunks]
+    for row in client.messages.batches.results(batch.id):
+        i = int(row.custom_id.rsplit("_", 1)[1])
+        if row.result.type != "succeeded":
+            print(f"  Chunk {i + 1}: batch request {row.result.type}")
+            continue
+        try:
+            results[i] = _parse_entries("{" + row.result.message.content[0].text)
+        except (IndexError, ValueError) as e:
+            print(f"  Chunk {i + 1}: could not parse batch result ({e})")
+    return results
+
+
+_EXTRACTORS = {
+    "openai": _extract_with_openai,
+    "anthropic": _extract_with_anthropic,
+    "groq": _extract_with_groq,
+}
+_DELTA_STREAMS = {
+    "openai": _openai_deltas,
+    "anthropic": _anthropic_deltas,
+    "groq": _groq_deltas,
+}
+
+
+def _read_pdf_text(pdf_path: str) -> str:
+    """
+    Extract all page text, joined once at the end. Uses pymupdf (C extension) when installed;
+    otherwise pypdf, parsing the file once and extracting pages in order (pypdf is pure
+    Python, so threads would only re-parse the file while contending for the GIL).
+    """
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+    if fitz is not None:
+        with fitz.open(pdf_path) as doc:
+            return "\n".join(page.get_text("text") for page in doc)
+
+    import pypdf
+
+    reader = pypdf.PdfReader(pdf_path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _iter_text_sections(path: str, section_chars: int = TEXT_SECTION_CHARS) -> Iterator[str]:
+    """
+    Stream a UTF-8 text file as sections of about `section_chars` chars: once that much is
+    buffered, it is cut after the last paragraph break (else line break) and the rest is
+    carried over, so only about one section is in memory at a time.
+    """
+    buf: List[str] = []
+    size = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            buf.append(line)
+            size += len(line)
+            if size < section_chars:
+                continue
+            text = "".join(buf)
+            cut = text.rfind("\n\n") + 2
+            if cut < 2:
+                cut = text.rfind("\n") + 1 or len(text)
+            yield text[:cut]
+            tail = text[cut:]
+            buf, size = ([tail], len(tail)) if tail else ([], 0)
+    if buf:
+        yield "".join(buf)
+
+
+def ingest_from_text_file(
+    path: str,
+    vector_store: Optional[VectorStore] = None,
+    save_to_rag: bool = True,
+    source_is_philosophy: bool = False,
+    max_workers: int = INGEST_WORKERS
+) -> List[Dict]:
+    """
+    Ingest a .txt/.md file without loading it whole: each section from _iter_text_sections
+    goes through ingest_from_text (chunking, extraction, vector store), and entries are
+    deduped by normalized pose across sections (first wins) and saved once.
+    
+    Args:
+        path: Path to a UTF-8 text file
+        vector_store: Optional vector store to save to
+        save_to_rag: If True, writes to data/yoga_knowledge.json (used by the app)
+        source_is_philosophy: If True, treat as yoga philosophy (瑜伽经), not physical asana
+        max_workers: Max chunks extracted concurrently
+    
+    Returns:
+        List of structured knowledge entries
+    """
+    by_key: Dict[str, Dict] = {}
+    try:
+        for section in _iter_text_sections(path):
+            for e in ingest_from_text(
+                section,
+                vector_store,
+                save_to_rag=False,
+                source_is_philosophy=source_is_philosophy,
+                max_workers=max_workers,
+            ):
+                if isinstance(e, dict) and e.get("pose"):
+                    by_key.setdefault(_norm_pose(str(e["pose"])), e)
+    except OSError as e:
+        print(f"Error reading {path}: {e}")
+    entries = list(by_key.values())
+    if save_to_rag and entries:
+        n = save_knowledge_to_file(entries, get_knowledge_path(), merge=True)
+        print(f"✓ Saved {n} entries to RAG knowledge file")
+    return entries
 
 
 def ingest_from_pdf(
     pdf_path: str,
     vector_store: Optional[VectorStore] = None,
     save_to_rag: bool = True,
-    source_is_philosophy: bool = False
+    source_is_philosophy: bool = False,
+    max_workers: int = INGEST_WORKERS
 ) -> List[Dict]:
     """
     Ingest yoga knowledge from PDF file (e.g. yoga book, 瑜伽经).
@@ -338,53 +1076,107 @@ def ingest_from_pdf(
         vector_store: Optional vector store to save to
         save_to_rag: If True, writes to data/yoga_knowledge.json (used by the app)
         source_is_philosophy: If True, treat as yoga philosophy (瑜伽经), not physical asana
+        max_workers: Max chunks extracted concurrently
     
     Returns:
         List of structured knowledge entries
     """
     try:
-        import PyPDF2
+        text = _read_pdf_text(pdf_path)
         
-        # Extract text from PDF
-        text = ""
-        with open(pdf_path, "rb") as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        
-        return ingest_from_text(text, vector_store, save_to_rag=save_to_rag, source_is_philosophy=source_is_philosophy)
+        return ingest_from_text(
+            text,
+            vector_store,
+            save_to_rag=save_to_rag,
+            source_is_philosophy=source_is_philosophy,
+            max_workers=max_workers,
+        )
     except ImportError:
-        print("Warning: PyPDF2 not installed. Install with: pip install PyPDF2")
+        print("Warning: no PDF library installed. Install with: pip install pymupdf (or pypdf)")
         return []
     except Exception as e:
         print(f"Error ingesting from PDF: {e}")
         return []
 
 
-def ingest_from_url(url: str, vector_store: Optional[VectorStore] = None) -> List[Dict]:
+def _html_to_text(html: str) -> str:
+    """Main text of an HTML page: trafilatura (boilerplate removed) if installed, else BeautifulSoup."""
+    try:
+        import trafilatura
+        text = trafilatura.extract(html)
+        if text:
+            return text
+    except ImportError:
+        pass
+    from bs4 import BeautifulSoup, FeatureNotFound
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text()
+
+
+async def _fetch_text(client, url: str) -> str:
+    response = await client.get(url, timeout=10, follow_redirects=True)
+    response.raise_for_status()
+    # HTML parsing is CPU-bound; run it off the event loop so other fetches keep progressing
+    return await asyncio.to_thread(_html_to_text, response.text)
+
+
+async def _fetch_all(urls: List[str]) -> List:
+    import httpx
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=10)) as client:
+        return await asyncio.gather(*[_fetch_text(client, u) for u in urls], return_exceptions=True)
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code. asyncio.run cannot be called while
+    an event loop is running in this thread (Jupyter, async web handlers), so in that case
+    the coroutine gets its own loop on a worker thread and this call blocks until it is done.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def _fetch_urls(urls: List[str]) -> List:
+    """
+    Fetch all URLs concurrently and return their page text, in order.
+    A failed fetch yields its exception in place of the text.
+    """
+    return _run_sync(_fetch_all(urls))
+
+
+def ingest_from_url(
+    url: str,
+    vector_store: Optional[VectorStore] = None,
+    max_workers: int = INGEST_WORKERS,
+    save_to_rag: bool = True
+) -> List[Dict]:
     """
     Ingest yoga knowledge from URL.
     
     Args:
         url: URL to fetch content from
         vector_store: Optional vector store to save to
+        save_to_rag: If True, writes to data/yoga_knowledge.json (used by the app)
+        max_workers: Max chunks extracted concurrently
     
     Returns:
         List of structured knowledge entries
     """
     try:
-        import requests
-        from bs4 import BeautifulSoup
+        text = _fetch_urls([url])[0]
+        if isinstance(text, BaseException):
+            raise text
         
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, "html.parser")
-        text = soup.get_text()
-        
-        return ingest_from_text(text, vector_store)
+        return ingest_from_text(text, vector_store, save_to_rag=save_to_rag, max_workers=max_workers)
     except ImportError:
-        print("Warning: requests or beautifulsoup4 not installed.")
+        print("Warning: httpx or beautifulsoup4 not installed.")
         return []
     except Exception as e:
         print(f"Error ingesting from URL: {e}")
@@ -411,8 +1203,7 @@ def ingest_from_knowledge_base(knowledge_base_path: str = None, vector_store: Op
         entries = kb.get_all_knowledge()
         
         if vector_store:
-            for entry in entries:
-                vector_store.add_knowledge(entry)
+            vector_store.add_knowledge_batch(entries)
         
         print(f"✓ Ingested {len(entries)} entries from knowledge base")
         return entries
@@ -421,16 +1212,82 @@ def ingest_from_knowledge_base(knowledge_base_path: str = None, vector_store: Op
         return []
 
 
+class _LockedStore:
+    """Vector store proxy that serializes adds across concurrently ingested sources."""
+
+    def __init__(self, store: VectorStore):
+        self._store = store
+        self._lock = threading.Lock()
+
+    def add_knowledge(self, entry: Dict):
+        with self._lock:
+            return self._store.add_knowledge(entry)
+
+    def add_knowledge_batch(self, entries: List[Dict]):
+        with self._lock:
+            return self._store.add_knowledge_batch(entries)
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
+
+async def _ingest_sources(sources: List[Dict], vector_store, max_workers: int) -> List:
+    """
+    Ingest every source as its own task and return their entry lists in source order (an
+    exception, or None for an unknown type, in place of a failed source). URL pages are
+    fetched on one shared async client; parsing and LLM extraction run in worker threads,
+    so PDFs, pages and texts overlap instead of queueing behind each other.
+    """
+    try:
+        import httpx
+        client = httpx.AsyncClient(limits=httpx.Limits(max_connections=10))
+    except ImportError:
+        client = None
+
+    async def run(source: Dict):
+        source_type = source.get("type")
+        if source_type == "json":
+            return await asyncio.to_thread(ingest_from_json, source["path"], vector_store, save_to_rag=False)
+        if source_type == "text":
+            return await asyncio.to_thread(
+                ingest_from_text, source["text"], vector_store, save_to_rag=False, max_workers=max_workers
+            )
+        if source_type == "pdf":
+            return await asyncio.to_thread(
+                ingest_from_pdf, source["path"], vector_store, save_to_rag=False, max_workers=max_workers
+            )
+        if source_type == "url":
+            if client is None:
+                raise ImportError("httpx not installed")
+            page = await _fetch_text(client, source["url"])
+            return await asyncio.to_thread(
+                ingest_from_text, page, vector_store, save_to_rag=False, max_workers=max_workers
+            )
+        if source_type == "knowledge_base":
+            return await asyncio.to_thread(ingest_from_knowledge_base, source.get("path"), vector_store)
+        print(f"Warning: Unknown source type: {source_type}")
+        return None
+
+    try:
+        return await asyncio.gather(*[run(s) for s in sources], return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.aclose()
+
+
 def batch_ingest(
     sources: List[Dict],
-    vector_store: Optional[VectorStore] = None
+    vector_store: Optional[VectorStore] = None,
+    max_workers: int = INGEST_WORKERS
 ) -> List[Dict]:
     """
-    Batch ingest from multiple sources.
+    Batch ingest from multiple sources. Sources are ingested concurrently (see
+    _ingest_sources); results are merged in source order.
     
     Args:
         sources: List of source dictionaries with 'type' and 'path'/'url'/'text'
         vector_store: Optional vector store to save to
+        max_workers: Max chunks extracted concurrently per long text/PDF/URL source
     
     Example:
         sources = [
@@ -442,26 +1299,32 @@ def batch_ingest(
     Returns:
         List of all ingested entries
     """
+    store = _LockedStore(vector_store) if vector_store else None
+    results = _run_sync(_ingest_sources(sources, store, max_workers))
     all_entries = []
+    # Entries to persist, keyed by normalized pose (later sources win); the RAG file is written once at the end
+    by_pose: Dict[str, Dict] = {}
     
-    for source in sources:
+    for source, entries in zip(sources, results):
         source_type = source.get("type")
-        
-        if source_type == "json":
-            entries = ingest_from_json(source["path"], vector_store)
-        elif source_type == "text":
-            entries = ingest_from_text(source["text"], vector_store)
-        elif source_type == "pdf":
-            entries = ingest_from_pdf(source["path"], vector_store)
-        elif source_type == "url":
-            entries = ingest_from_url(source["url"], vector_store)
-        elif source_type == "knowledge_base":
-            entries = ingest_from_knowledge_base(source.get("path"), vector_store)
-        else:
-            print(f"Warning: Unknown source type: {source_type}")
+        if isinstance(entries, ImportError) and source_type == "url":
+            print("Warning: httpx or beautifulsoup4 not installed.")
+            continue
+        if isinstance(entries, BaseException):
+            print(f"Error ingesting from {source_type}: {entries}")
+            continue
+        if not entries:
             continue
         
         all_entries.extend(entries)
+        if source_type == "knowledge_base":
+            continue
+        for e in entries:
+            if isinstance(e, dict) and e.get("pose"):
+                by_pose[_norm_pose(str(e["pose"]))] = e
     
+    if by_pose:
+        n = save_knowledge_to_file(list(by_pose.values()), get_knowledge_path(), merge=True)
+        print(f"✓ Saved {n} entries to RAG knowledge file")
     print(f"✓ Batch ingested {len(all_entries)} total entries")
     return all_entries
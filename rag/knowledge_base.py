@@ -2,9 +2,16 @@
 Knowledge Base - Structured yoga knowledge for RAG retrieval
 Loads from built-in data + data/yoga_knowledge.json (from ingested books) when present.
 """
+import bisect
+import functools
+import itertools
 import os
+import re
+import sys
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
 
 
 def _default_knowledge_path() -> Path:
@@ -12,317 +19,510 @@ def _default_knowledge_path() -> Path:
     return get_knowledge_path()
 
 
+# Benefit keywords per cycle phase (matched as substrings of lowercased benefits,
+# so "calm" also matches "calms"/"calming")
+PHASE_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "menstrual": frozenset({"calm", "restorative", "gentle", "relax"}),
+    "follicular": frozenset({"strength", "building", "energizing"}),
+    "ovulation": frozenset({"peak", "strength", "balance"}),
+    "luteal": frozenset({"gentle", "calm", "restorative"}),
+}
+
+
+def get_default_knowledge_base() -> "KnowledgeBase":
+    """
+    Process-wide KnowledgeBase for the default knowledge file, so the JSON is parsed once per
+    process. Reloaded when the file's mtime changes (e.g. after an ingest).
+    """
+    path = _default_knowledge_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = None
+    return _get_default_kb(str(path), mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_default_kb(path: str, mtime: Optional[float]) -> "KnowledgeBase":
+    return KnowledgeBase(Path(path))
+
+
+def _str_items(value) -> List[str]:
+    """
+    Text items of an entry field, tolerating ingested data of the wrong shape: a string is
+    one item, a list keeps only its string items, None is empty, other scalars use str().
+    """
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, str)]
+    return [] if value is None else [str(value)]
+
+
+def _field_text(value) -> str:
+    """Text items of an entry field (see _str_items) joined by spaces."""
+    return " ".join(_str_items(value))
+
+
+def _search_text(entry: Dict) -> str:
+    """Lowercased text of an entry that chat search matches query words against."""
+    pose = _field_text(entry.get("pose")).lower().replace("_", " ")
+    benefits = _field_text(entry.get("benefits")).lower()
+    alignment = _field_text(entry.get("alignment")).lower()
+    breathing = _field_text(entry.get("breathing")).lower()
+    modifications = _field_text(entry.get("modifications")).lower()
+    return f"{pose} {benefits} {alignment} {breathing} {modifications}"
+
+
+def _chat_chunk(entry: Dict) -> str:
+    """Entry formatted as a chat context block (pose header, top benefits/alignment, breathing, cautions)."""
+    parts = [f"**{entry.get('pose', '')}**"]
+    benefits = _str_items(entry.get("benefits"))
+    if benefits:
+        parts.append("Benefits: " + "; ".join(benefits[:3]))
+    alignment = _str_items(entry.get("alignment"))
+    if alignment:
+        parts.append("Alignment: " + "; ".join(alignment[:3]))
+    breathing = _field_text(entry.get("breathing"))
+    if breathing:
+        parts.append("Breathing: " + breathing)
+    contraindications = _str_items(entry.get("contraindications"))
+    if contraindications:
+        parts.append("Avoid if: " + "; ".join(contraindications[:2]))
+    return "\n".join(parts)
+
+
+# Built-in pose knowledge; shared by all instances (copied shallowly, entries are not mutated)
+_BUILTIN_KNOWLEDGE: List[Dict] = [
+    {
+        "pose": "child_pose",
+        "alignment": [
+            "Knees should be hip-width apart or wider",
+            "Big toes touching behind you",
+            "Sit back on your heels",
+            "Forehead rests on the mat",
+            "Arms can be extended forward or alongside body"
+        ],
+        "contraindications": [
+            "Knee injury",
+            "Ankle injury",
+            "Pregnancy (third trimester)"
+        ],
+        "benefits": [
+            "Calms the nervous system",
+            "Stretches hips and thighs",
+            "Relieves back tension"
+        ],
+        "breathing": "Breathe deeply into your back body",
+        "modifications": "Place a pillow between thighs and calves if knees are sensitive"
+    },
+    {
+        "pose": "cat_cow",
+        "alignment": [
+            "Start on hands and knees, wrists under shoulders, knees under hips",
+            "Move with your breath",
+            "Inhale: arch back, lift tailbone and head (cow)",
+            "Exhale: round spine, tuck tailbone (cat)",
+            "Keep shoulders away from ears"
+        ],
+        "contraindications": [
+            "Severe wrist injury",
+            "Severe back pain"
+        ],
+        "benefits": [
+            "Mobilizes the spine",
+            "Improves coordination",
+            "Warms up the body"
+        ],
+        "breathing": "Sync movement with breath - inhale cow, exhale cat",
+        "modifications": "Place hands on blocks if wrists are sensitive"
+    },
+    {
+        "pose": "supine_twist",
+        "alignment": [
+            "Lie on your back",
+            "Hug one knee to chest",
+            "Gently guide knee across body",
+            "Keep both shoulders on the mat",
+            "Gaze opposite direction of knee"
+        ],
+        "contraindications": [
+            "Severe back injury",
+            "Pregnancy (avoid deep twists)"
+        ],
+        "benefits": [
+            "Releases tension in lower back",
+            "Stretches spine",
+            "Calms nervous system"
+        ],
+        "breathing": "Breathe deeply, allowing the twist to deepen with each exhale",
+        "modifications": "Place a pillow under the bent knee for support"
+    },
+    {
+        "pose": "legs_up_wall",
+        "alignment": [
+            "Sit sideways next to wall",
+            "Swing legs up wall as you lie down",
+            "Hips close to wall (or slightly away if hamstrings are tight)",
+            "Arms relaxed at sides",
+            "Close eyes and relax"
+        ],
+        "contraindications": [
+            "Glaucoma",
+            "Severe eye pressure"
+        ],
+        "benefits": [
+            "Relieves tired legs",
+            "Calms nervous system",
+            "Reduces swelling",
+            "Excellent for menstrual phase"
+        ],
+        "breathing": "Natural, relaxed breathing",
+        "modifications": "Place a folded blanket under hips for support"
+    },
+    {
+        "pose": "mountain_pose",
+        "alignment": [
+            "Stand with feet hip-width apart or together",
+            "Weight evenly distributed on all four corners of feet",
+            "Knees soft, not locked",
+            "Pelvis neutral",
+            "Shoulders relaxed, away from ears",
+            "Crown of head reaching toward sky"
+        ],
+        "contraindications": [],
+        "benefits": [
+            "Improves posture",
+            "Builds body awareness",
+            "Foundation for all standing poses"
+        ],
+        "breathing": "Deep, steady breathing",
+        "modifications": "Stand with back against wall for alignment feedback"
+    },
+    {
+        "pose": "warrior_ii",
+        "alignment": [
+            "Step feet wide apart",
+            "Turn back foot in 45 degrees",
+            "Front knee bent, tracking over ankle",
+            "Back leg straight and strong",
+            "Arms parallel to floor",
+            "Gaze over front middle finger",
+            "Hips squared to side"
+        ],
+        "contraindications": [
+            "Hip injury",
+            "Knee injury"
+        ],
+        "benefits": [
+            "Strengthens legs",
+            "Opens hips",
+            "Builds stamina"
+        ],
+        "breathing": "Breathe deeply, maintaining steady breath",
+        "modifications": "Reduce depth of lunge if knee discomfort"
+    },
+    {
+        "pose": "tree_pose",
+        "alignment": [
+            "Stand on one leg",
+            "Place foot on inner thigh, calf, or ankle (not on knee)",
+            "Press foot into leg, leg into foot",
+            "Hips squared forward",
+            "Hands at heart center or overhead",
+            "Focus on a fixed point (drishti)"
+        ],
+        "contraindications": [
+            "Ankle injury",
+            "Severe balance issues"
+        ],
+        "benefits": [
+            "Improves balance",
+            "Strengthens standing leg",
+            "Opens hip of lifted leg"
+        ],
+        "breathing": "Steady, calm breathing",
+        "modifications": "Use wall for support or place foot on ankle instead of thigh"
+    },
+    {
+        "pose": "seated_forward_fold",
+        "alignment": [
+            "Sit with legs extended",
+            "Flex feet, toes pointing toward ceiling",
+            "Hinge from hips, not rounding lower back",
+            "Reach forward, not down",
+            "Keep spine long"
+        ],
+        "contraindications": [
+            "Severe back injury",
+            "Hamstring injury"
+        ],
+        "benefits": [
+            "Stretches hamstrings",
+            "Calms nervous system",
+            "Relieves stress"
+        ],
+        "breathing": "Breathe into the back body, allowing stretch to deepen",
+        "modifications": "Sit on a blanket or bend knees slightly"
+    },
+    {
+        "pose": "pigeon_pose",
+        "alignment": [
+            "From downward dog, bring front leg forward",
+            "Front shin parallel to front of mat (or more accessible variation)",
+            "Back leg extended straight behind",
+            "Hips squared forward",
+            "Keep front foot flexed to protect knee"
+        ],
+        "contraindications": [
+            "Knee injury",
+            "Hip injury",
+            "SI joint issues"
+        ],
+        "benefits": [
+            "Deep hip opener",
+            "Releases tension in glutes",
+            "Excellent for menstrual phase"
+        ],
+        "breathing": "Breathe deeply, allowing hip to release",
+        "modifications": "Place pillow under front hip, or do reclining pigeon instead"
+    },
+    {
+        "pose": "cobra_pose",
+        "alignment": [
+            "Lie on belly",
+            "Place hands under shoulders",
+            "Press tops of feet into mat",
+            "Lift chest using back muscles, not just arms",
+            "Keep shoulders away from ears",
+            "Gaze forward or slightly up"
+        ],
+        "contraindications": [
+            "Severe back injury",
+            "Pregnancy (avoid after first trimester)",
+            "Carpal tunnel"
+        ],
+        "benefits": [
+            "Strengthens back",
+            "Opens chest",
+            "Improves posture"
+        ],
+        "breathing": "Breathe deeply as you lift",
+        "modifications": "Keep elbows bent, less lift if back is sensitive"
+    },
+    {
+        "pose": "bridge_pose",
+        "alignment": [
+            "Lie on back, knees bent",
+            "Feet hip-width apart, close to glutes",
+            "Press feet into mat",
+            "Lift hips, engaging glutes",
+            "Keep knees tracking over ankles",
+            "Interlace hands under body or keep arms at sides"
+        ],
+        "contraindications": [
+            "Neck injury",
+            "Knee injury"
+        ],
+        "benefits": [
+            "Strengthens glutes",
+            "Opens chest",
+            "Stretches hip flexors"
+        ],
+        "breathing": "Breathe deeply as you hold",
+        "modifications": "Place block under sacrum for support"
+    },
+    {
+        "pose": "downward_dog",
+        "alignment": [
+            "Start on hands and knees",
+            "Tuck toes, lift hips up and back",
+            "Create inverted V shape",
+            "Hands shoulder-width apart",
+            "Feet hip-width apart",
+            "Hips high, weight back toward legs",
+            "Keep micro-bend in knees if hamstrings are tight"
+        ],
+        "contraindications": [
+            "Wrist injury",
+            "High blood pressure",
+            "Glaucoma"
+        ],
+        "benefits": [
+            "Strengthens arms and legs",
+            "Stretches hamstrings",
+            "Calms brain"
+        ],
+        "breathing": "Steady, deep breathing",
+        "modifications": "Bend knees deeply, use blocks under hands, or do at wall"
+    },
+    {
+        "pose": "breath_awareness",
+        "alignment": [
+            "Comfortable seated or lying position",
+            "Spine long if seated",
+            "Close eyes",
+            "Relax body"
+        ],
+        "contraindications": [],
+        "benefits": [
+            "Calms nervous system",
+            "Reduces stress",
+            "Improves focus",
+            "Excellent for all cycle phases"
+        ],
+        "breathing": "Observe natural breath, then deepen gradually",
+        "modifications": "Can be done in any comfortable position"
+    },
+]
+
+
 class KnowledgeBase:
     """
     Yoga knowledge base for RAG retrieval.
     Uses built-in entries; if data/yoga_knowledge.json exists, loads and merges
     those entries (file wins by pose name). Ingested yoga books are stored there.
+    The file is read, and the indexes built, on first use rather than at construction.
     """
     
     def __init__(self, knowledge_file: Optional[Path] = None):
+        self._knowledge_path = knowledge_file or _default_knowledge_path()
+        self._knowledge: Optional[List[Dict]] = None
+        self._load_lock = threading.Lock()
+    
+    @property
+    def knowledge(self) -> List[Dict]:
+        """All entries (built-in merged with the knowledge file); loads them on first access."""
+        self._ensure_loaded()
+        return self._knowledge
+    
+    def _ensure_loaded(self) -> None:
+        if self._knowledge is None:
+            with self._load_lock:
+                if self._knowledge is None:
+                    self._load()
+    
+    def _load(self) -> None:
+        """Merge built-in entries with the knowledge file and build the lookup indexes."""
         builtin = self._initialize_knowledge()
-        path = knowledge_file or _default_knowledge_path()
-        if path.exists():
+        path = self._knowledge_path
+        try:
+            f = open(path, "rb")
+        except OSError:
+            f = None
+        if f is not None:
             try:
-                from .knowledge_io import load_knowledge_from_file
-                from_file = load_knowledge_from_file(path)
-                merged = {e.get("pose"): e for e in builtin if e.get("pose")}
-                for e in from_file:
-                    if e.get("pose"):
-                        merged[e["pose"]] = e
-                self.knowledge = list(merged.values())
+                from .knowledge_io import load_knowledge_from_fileobj
+                with f:
+                    from_file = load_knowledge_from_fileobj(f)
+                # File entries win by pose (last write wins in one sweep)
+                merged = {e["pose"]: e for e in itertools.chain(builtin, from_file) if e.get("pose")}
+                knowledge = list(merged.values())
             except Exception:
-                self.knowledge = builtin
+                knowledge = builtin
         else:
-            self.knowledge = builtin
+            knowledge = builtin
+        try:
+            self._build_indexes(knowledge)
+        except Exception as e:
+            # A file entry the indexes can't handle: serve the built-in entries, and publish
+            # them so the failure is not retried (and re-raised) on every query
+            print(f"Warning: Could not index knowledge file {path}: {e}; using built-in knowledge only")
+            knowledge = builtin
+            self._build_indexes(knowledge)
+        self._knowledge = knowledge  # published last: readers see fully built indexes
+    
+    def _build_indexes(self, knowledge: List[Dict]) -> None:
+        """Pose, chat search, chat block and phase lookups over the merged entries."""
+        # Pose name -> entry for O(1) lookups (first entry wins, as with the linear scan);
+        # keys are interned so hits against interned names compare by identity
+        self._by_pose = {
+            sys.intern(e["pose"]) if isinstance(e["pose"], str) else e["pose"]: e
+            for e in reversed(knowledge)
+            if e.get("pose")
+        }
+        self._build_search_index(knowledge)
+        # Entries are not modified after load, so their chat blocks are rendered once
+        self._chat_chunks = [_chat_chunk(e) for e in knowledge]
+        self._benefits_text = [_field_text(e.get("benefits")).lower() for e in knowledge]
+        self._by_phase: Dict[str, List[Dict]] = {}
+    
+    def _build_search_index(self, knowledge: List[Dict]) -> None:
+        """
+        Inverted index for chat search: whitespace token of an entry's search text -> entry
+        indices. A query word (no whitespace) occurs in an entry's text exactly when it is a
+        substring of one of its tokens, so matching scans the vocabulary, not every entry.
+        """
+        index: Dict[str, Set[int]] = {}
+        for i, entry in enumerate(knowledge):
+            for token in _search_text(entry).split():
+                index.setdefault(token, set()).add(i)
+        self._token_index = index
+        # Vocabulary as one newline-joined string (tokens never contain whitespace) plus the
+        # start offset of each token, so a regex scan maps match positions back to tokens
+        self._vocab = list(index)
+        self._vocab_text = "\n".join(self._vocab)
+        self._vocab_starts = []
+        pos = 0
+        for token in self._vocab:
+            self._vocab_starts.append(pos)
+            pos += len(token) + 1
+        self._word_cache: Dict[str, FrozenSet[int]] = {}
+    
+    def _match_words(self, words: List[str]) -> None:
+        """
+        Cache the entry indices matching each word. One precompiled alternation regex scans the
+        vocabulary in C; any token containing a word also contains a match, so only matched
+        tokens are checked word by word.
+        """
+        pattern = re.compile("|".join(sorted(map(re.escape, words), key=len, reverse=True)))
+        hits: Dict[str, Set[int]] = {w: set() for w in words}
+        seen: Set[int] = set()
+        for m in pattern.finditer(self._vocab_text):
+            t = bisect.bisect_right(self._vocab_starts, m.start()) - 1
+            if t in seen:
+                continue
+            seen.add(t)
+            token = self._vocab[t]
+            for w in words:
+                if w in token:
+                    hits[w] |= self._token_index[token]
+        if len(self._word_cache) > 4096:
+            self._word_cache.clear()
+        for w, ids in hits.items():
+            self._word_cache[w] = frozenset(ids)
+    
+    def chat_chunk(self, index: int) -> str:
+        """Pre-rendered chat context block of the entry at `index` in self.knowledge."""
+        self._ensure_loaded()
+        return self._chat_chunks[index]
+    
+    def match_counts(self, words: Iterable[str]) -> Counter:
+        """
+        Count, per entry index, how many of the (lowercase) query words its search text contains.
+        
+        Args:
+            words: Distinct lowercase query words
+        
+        Returns:
+            Counter of entry index -> number of matching words (matching entries only)
+        """
+        self._ensure_loaded()
+        words = list(words)
+        missing = [w for w in words if w not in self._word_cache]
+        if missing:
+            self._match_words(missing)
+        counts: Counter = Counter()
+        for w in words:
+            counts.update(self._word_cache[w])
+        return counts
     
     def _initialize_knowledge(self) -> List[Dict]:
         """
         Initialize knowledge base with pose information.
         Each entry contains alignment cues, contraindications, and explanations.
         """
-        return [
-            {
-                "pose": "child_pose",
-                "alignment": [
-                    "Knees should be hip-width apart or wider",
-                    "Big toes touching behind you",
-                    "Sit back on your heels",
-                    "Forehead rests on the mat",
-                    "Arms can be extended forward or alongside body"
-                ],
-                "contraindications": [
-                    "Knee injury",
-                    "Ankle injury",
-                    "Pregnancy (third trimester)"
-                ],
-                "benefits": [
-                    "Calms the nervous system",
-                    "Stretches hips and thighs",
-                    "Relieves back tension"
-                ],
-                "breathing": "Breathe deeply into your back body",
-                "modifications": "Place a pillow between thighs and calves if knees are sensitive"
-            },
-            {
-                "pose": "cat_cow",
-                "alignment": [
-                    "Start on hands and knees, wrists under shoulders, knees under hips",
-                    "Move with your breath",
-                    "Inhale: arch back, lift tailbone and head (cow)",
-                    "Exhale: round spine, tuck tailbone (cat)",
-                    "Keep shoulders away from ears"
-                ],
-                "contraindications": [
-                    "Severe wrist injury",
-                    "Severe back pain"
-                ],
-                "benefits": [
-                    "Mobilizes the spine",
-                    "Improves coordination",
-                    "Warms up the body"
-                ],
-                "breathing": "Sync movement with breath - inhale cow, exhale cat",
-                "modifications": "Place hands on blocks if wrists are sensitive"
-            },
-            {
-                "pose": "supine_twist",
-                "alignment": [
-                    "Lie on your back",
-                    "Hug one knee to chest",
-                    "Gently guide knee across body",
-                    "Keep both shoulders on the mat",
-                    "Gaze opposite direction of knee"
-                ],
-                "contraindications": [
-                    "Severe back injury",
-                    "Pregnancy (avoid deep twists)"
-                ],
-                "benefits": [
-                    "Releases tension in lower back",
-                    "Stretches spine",
-                    "Calms nervous system"
-                ],
-                "breathing": "Breathe deeply, allowing the twist to deepen with each exhale",
-                "modifications": "Place a pillow under the bent knee for support"
-            },
-            {
-                "pose": "legs_up_wall",
-                "alignment": [
-                    "Sit sideways next to wall",
-                    "Swing legs up wall as you lie down",
-                    "Hips close to wall (or slightly away if hamstrings are tight)",
-                    "Arms relaxed at sides",
-                    "Close eyes and relax"
-                ],
-                "contraindications": [
-                    "Glaucoma",
-                    "Severe eye pressure"
-                ],
-                "benefits": [
-                    "Relieves tired legs",
-                    "Calms nervous system",
-                    "Reduces swelling",
-                    "Excellent for menstrual phase"
-                ],
-                "breathing": "Natural, relaxed breathing",
-                "modifications": "Place a folded blanket under hips for support"
-            },
-            {
-                "pose": "mountain_pose",
-                "alignment": [
-                    "Stand with feet hip-width apart or together",
-                    "Weight evenly distributed on all four corners of feet",
-                    "Knees soft, not locked",
-                    "Pelvis neutral",
-                    "Shoulders relaxed, away from ears",
-                    "Crown of head reaching toward sky"
-                ],
-                "contraindications": [],
-                "benefits": [
-                    "Improves posture",
-                    "Builds body awareness",
-                    "Foundation for all standing poses"
-                ],
-                "breathing": "Deep, steady breathing",
-                "modifications": "Stand with back against wall for alignment feedback"
-            },
-            {
-                "pose": "warrior_ii",
-                "alignment": [
-                    "Step feet wide apart",
-                    "Turn back foot in 45 degrees",
-                    "Front knee bent, tracking over ankle",
-                    "Back leg straight and strong",
-                    "Arms parallel to floor",
-                    "Gaze over front middle finger",
-                    "Hips squared to side"
-                ],
-                "contraindications": [
-                    "Hip injury",
-                    "Knee injury"
-                ],
-                "benefits": [
-                    "Strengthens legs",
-                    "Opens hips",
-                    "Builds stamina"
-                ],
-                "breathing": "Breathe deeply, maintaining steady breath",
-                "modifications": "Reduce depth of lunge if knee discomfort"
-            },
-            {
-                "pose": "tree_pose",
-                "alignment": [
-                    "Stand on one leg",
-                    "Place foot on inner thigh, calf, or ankle (not on knee)",
-                    "Press foot into leg, leg into foot",
-                    "Hips squared forward",
-                    "Hands at heart center or overhead",
-                    "Focus on a fixed point (drishti)"
-                ],
-                "contraindications": [
-                    "Ankle injury",
-                    "Severe balance issues"
-                ],
-                "benefits": [
-                    "Improves balance",
-                    "Strengthens standing leg",
-                    "Opens hip of lifted leg"
-                ],
-                "breathing": "Steady, calm breathing",
-                "modifications": "Use wall for support or place foot on ankle instead of thigh"
-            },
-            {
-                "pose": "seated_forward_fold",
-                "alignment": [
-                    "Sit with legs extended",
-                    "Flex feet, toes pointing toward ceiling",
-                    "Hinge from hips, not rounding lower back",
-                    "Reach forward, not down",
-                    "Keep spine long"
-                ],
-                "contraindications": [
-                    "Severe back injury",
-                    "Hamstring injury"
-                ],
-                "benefits": [
-                    "Stretches hamstrings",
-                    "Calms nervous system",
-                    "Relieves stress"
-                ],
-                "breathing": "Breathe into the back body, allowing stretch to deepen",
-                "modifications": "Sit on a blanket or bend knees slightly"
-            },
-            {
-                "pose": "pigeon_pose",
-                "alignment": [
-                    "From downward dog, bring front leg forward",
-                    "Front shin parallel to front of mat (or more accessible variation)",
-                    "Back leg extended straight behind",
-                    "Hips squared forward",
-                    "Keep front foot flexed to protect knee"
-                ],
-                "contraindications": [
-                    "Knee injury",
-                    "Hip injury",
-                    "SI joint issues"
-                ],
-                "benefits": [
-                    "Deep hip opener",
-                    "Releases tension in glutes",
-                    "Excellent for menstrual phase"
-                ],
-                "breathing": "Breathe deeply, allowing hip to release",
-                "modifications": "Place pillow under front hip, or do reclining pigeon instead"
-            },
-            {
-                "pose": "cobra_pose",
-                "alignment": [
-                    "Lie on belly",
-                    "Place hands under shoulders",
-                    "Press tops of feet into mat",
-                    "Lift chest using back muscles, not just arms",
-                    "Keep shoulders away from ears",
-                    "Gaze forward or slightly up"
-                ],
-                "contraindications": [
-                    "Severe back injury",
-                    "Pregnancy (avoid after first trimester)",
-                    "Carpal tunnel"
-                ],
-                "benefits": [
-                    "Strengthens back",
-                    "Opens chest",
-                    "Improves posture"
-                ],
-                "breathing": "Breathe deeply as you lift",
-                "modifications": "Keep elbows bent, less lift if back is sensitive"
-            },
-            {
-                "pose": "bridge_pose",
-                "alignment": [
-                    "Lie on back, knees bent",
-                    "Feet hip-width apart, close to glutes",
-                    "Press feet into mat",
-                    "Lift hips, engaging glutes",
-                    "Keep knees tracking over ankles",
-                    "Interlace hands under body or keep arms at sides"
-                ],
-                "contraindications": [
-                    "Neck injury",
-                    "Knee injury"
-                ],
-                "benefits": [
-                    "Strengthens glutes",
-                    "Opens chest",
-                    "Stretches hip flexors"
-                ],
-                "breathing": "Breathe deeply as you hold",
-                "modifications": "Place block under sacrum for support"
-            },
-            {
-                "pose": "downward_dog",
-                "alignment": [
-                    "Start on hands and knees",
-                    "Tuck toes, lift hips up and back",
-                    "Create inverted V shape",
-                    "Hands shoulder-width apart",
-                    "Feet hip-width apart",
-                    "Hips high, weight back toward legs",
-                    "Keep micro-bend in knees if hamstrings are tight"
-                ],
-                "contraindications": [
-                    "Wrist injury",
-                    "High blood pressure",
-                    "Glaucoma"
-                ],
-                "benefits": [
-                    "Strengthens arms and legs",
-                    "Stretches hamstrings",
-                    "Calms brain"
-                ],
-                "breathing": "Steady, deep breathing",
-                "modifications": "Bend knees deeply, use blocks under hands, or do at wall"
-            },
-            {
-                "pose": "breath_awareness",
-                "alignment": [
-                    "Comfortable seated or lying position",
-                    "Spine long if seated",
-                    "Close eyes",
-                    "Relax body"
-                ],
-                "contraindications": [],
-                "benefits": [
-                    "Calms nervous system",
-                    "Reduces stress",
-                    "Improves focus",
-                    "Excellent for all cycle phases"
-                ],
-                "breathing": "Observe natural breath, then deepen gradually",
-                "modifications": "Can be done in any comfortable position"
-            },
-        ]
+        return list(_BUILTIN_KNOWLEDGE)
     
     def retrieve_by_pose(self, pose_name: str) -> Optional[Dict]:
         """
@@ -334,10 +534,8 @@ class KnowledgeBase:
         Returns:
             Knowledge dictionary or None
         """
-        for entry in self.knowledge:
-            if entry.get("pose") == pose_name:
-                return entry
-        return None
+        self._ensure_loaded()
+        return self._by_pose.get(pose_name)
     
     def retrieve_by_cycle_phase(self, cycle_phase: str) -> List[Dict]:
         """
@@ -350,23 +548,20 @@ class KnowledgeBase:
         Returns:
             List of relevant knowledge entries
         """
-        # Simple keyword matching for v1.0
-        phase_keywords = {
-            "menstrual": ["calm", "restorative", "gentle", "relax"],
-            "follicular": ["strength", "building", "energizing"],
-            "ovulation": ["peak", "strength", "balance"],
-            "luteal": ["gentle", "calm", "restorative"]
-        }
-        
-        keywords = phase_keywords.get(cycle_phase, [])
-        relevant = []
-        
-        for entry in self.knowledge:
-            benefits = " ".join(entry.get("benefits", [])).lower()
-            if any(kw in benefits for kw in keywords):
-                relevant.append(entry)
+        # Simple keyword matching for v1.0; entries don't change after load, so each
+        # phase is matched once against the pre-lowered benefits and then reused
+        self._ensure_loaded()
+        relevant = self._by_phase.get(cycle_phase)
+        if relevant is None:
+            keywords = PHASE_KEYWORDS.get(cycle_phase, frozenset())
+            relevant = [
+                entry
+                for entry, benefits in zip(self.knowledge, self._benefits_text)
+                if any(kw in benefits for kw in keywords)
+            ]
+            self._by_phase[cycle_phase] = relevant
         
-        return relevant if relevant else self.knowledge[:5]  # Default to first 5
+        return list(relevant) if relevant else self.knowledge[:5]  # Default to first 5
     
     def get_all_knowledge(self) -> List[Dict]:
         """Get all knowledge entries."""
@@ -2,12 +2,44 @@
 Load/save yoga knowledge from the RAG knowledge file.
 The app's KnowledgeBase loads from this file so ingested books are used automatically.
 """
+import itertools
 import json
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:  # stdlib fallback
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 DEFAULT_KNOWLEDGE_FILE = "data/yoga_knowledge.json"
+# Knowledge files at least this large are streamed entry by entry with ijson (if installed)
+STREAM_LOAD_BYTES = 2 * 1024 * 1024
+# Writes at least this large bypass the page cache with O_DIRECT where supported (see write_bytes)
+DIRECT_IO_MIN_BYTES = 1024 * 1024
+_DIRECT_IO_ALIGN = 4096
+
+# Last state written per path: ((st_mtime_ns, st_size) after the write, entries by pose).
+# A merge-save whose file still matches reuses it instead of re-reading the file.
+_MIRROR: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict]]] = {}
+
+
+def _file_sig(p: Path) -> Tuple[int, int]:
+    st = p.stat()
+    return st.st_mtime_ns, st.st_size
 
 
 def get_knowledge_path() -> Path:
@@ -22,16 +54,120 @@ def load_knowledge_from_file(path: Path = None) -> List[Dict]:
     Returns [] if file does not exist or is invalid.
     """
     p = path or get_knowledge_path()
-    if not p.exists():
+    try:
+        f = open(p, "rb")
+    except OSError:
         return []
+    with f:
+        return load_knowledge_from_fileobj(f)
+
+
+def load_knowledge_from_fileobj(f) -> List[Dict]:
+    """
+    Load knowledge entries from an open binary file (one open, one fstat).
+    Returns [] if the content is invalid.
+    """
     try:
-        with open(p, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else data.get("entries", [])
+        entries = None
+        if os.fstat(f.fileno()).st_size >= STREAM_LOAD_BYTES:
+            try:
+                entries = list(iter_entries_from_file(f))
+            except ImportError:
+                f.seek(0)
+        if entries is None:
+            data = _loads(f.read())
+            entries = data if isinstance(data, list) else data.get("entries", [])
+        return _intern_poses(entries)
     except Exception:
         return []
 
 
+def _intern_poses(entries: List[Dict]) -> List[Dict]:
+    """Intern pose names (dict keys / equality targets in lookups) in freshly parsed entries."""
+    for e in entries:
+        pose = e.get("pose") if isinstance(e, dict) else None
+        if isinstance(pose, str):
+            e["pose"] = sys.intern(pose)
+    return entries
+
+
+def iter_entries_from_file(f) -> Iterator[Dict]:
+    """
+    Stream entries one at a time with ijson from a binary JSON file object holding a
+    top-level array or {"entries": [...]}. Raises ImportError if ijson is not installed.
+    """
+    import ijson
+
+    first = b""
+    while True:
+        block = f.read(64)
+        first = block.lstrip()[:1]
+        if first or not block:
+            break
+    f.seek(0)
+    prefix = "entries.item" if first == b"{" else "item"
+    yield from ijson.items(f, prefix, use_float=True)
+
+
+def write_bytes(path, data: bytes) -> None:
+    """
+    Atomically replace the file at `path` with `data`: the bytes go to a temp file in the
+    same directory, which is then renamed over `path`, so a crash never leaves it truncated.
+    Large writes on Linux go out as one O_DIRECT write from a page-aligned buffer;
+    filesystems that refuse O_DIRECT (e.g. tmpfs) and other platforms get a plain buffered write.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        written = False
+        if len(data) >= DIRECT_IO_MIN_BYTES and hasattr(os, "O_DIRECT"):
+            try:
+                _write_direct(tmp, data)
+                written = True
+            except OSError:
+                pass
+        if not written:
+            with open(tmp, "wb") as f:
+                f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_direct(path, data: bytes) -> None:
+    import mmap
+
+    size = -(-len(data) // _DIRECT_IO_ALIGN) * _DIRECT_IO_ALIGN
+    buf = mmap.mmap(-1, size)  # anonymous mappings are page-aligned, as O_DIRECT requires
+    try:
+        buf.write(data)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o666)
+        try:
+            with memoryview(buf) as view:
+                written = 0
+                while written < size:
+                    written += os.write(fd, view[written:])
+            os.ftruncate(fd, len(data))  # drop the alignment padding
+        finally:
+            os.close(fd)
+    finally:
+        buf.close()
+
+
+def _same_content(p: Path, buf: bytes) -> bool:
+    """True if the file already holds exactly `buf` (sizes are compared before any read)."""
+    try:
+        if p.stat().st_size != len(buf):
+            return False
+        with open(p, "rb") as f:
+            return f.read() == buf
+    except OSError:
+        return False
+
+
 def save_knowledge_to_file(
     entries: List[Dict],
     path: Path = None,
@@ -46,14 +182,28 @@ def save_knowledge_to_file(
     p = Path(p)
     p.parent.mkdir(parents=True, exist_ok=True)
 
+    key = str(p)
+    by_pose = None
     if merge and p.exists():
-        existing = {e.get("pose"): e for e in load_knowledge_from_file(p) if e.get("pose")}
-        for e in entries:
-            if e.get("pose"):
-                existing[e["pose"]] = e
+        mirror = _MIRROR.get(key)
+        if mirror is not None and mirror[0] == _file_sig(p):
+            current = mirror[1].values()
+        else:
+            current = load_knowledge_from_file(p)
+        # One sweep; later (new) entries win by pose, dict keeps first-insertion order
+        existing = {e["pose"]: e for e in itertools.chain(current, entries) if e.get("pose")}
         entries = list(existing.values())
+        by_pose = existing
+
+    buf = _dumps_pretty(entries)
+    if not _same_content(p, buf):
+        write_bytes(p, buf)
 
-    with open(p, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
+    if by_pose is None:
+        by_pose = {e.get("pose"): e for e in entries if e.get("pose")}
+    if len(by_pose) == len(entries):
+        _MIRROR[key] = (_file_sig(p), by_pose)
+    else:  # entries without (or with duplicate) pose names can't be mirrored by pose
+        _MIRROR.pop(key, None)
 
     return len(entries)
@@ -3,12 +3,23 @@ RAG Retriever - Retrieves enriched pose information
 v1.0: Simple retrieval from knowledge base
 Future: Can integrate vector database for semantic search
 """
+import heapq
 import logging
 from typing import List, Dict
-from .knowledge_base import KnowledgeBase
+from .knowledge_base import get_default_knowledge_base
 
 logger = logging.getLogger(__name__)
 
+# Enrichment for poses without knowledge; list fields are copied per pose so callers can mutate them
+_DEFAULTS = {
+    "alignment_cues": [],
+    "contraindications": [],
+    "benefits": [],
+    "breathing_guidance": "Breathe deeply and steadily",
+    "modifications": "",
+}
+_LIST_FIELDS = ("alignment_cues", "contraindications", "benefits")
+
 
 class RAGRetriever:
     """
@@ -16,7 +27,7 @@ class RAGRetriever:
     """
     
     def __init__(self):
-        self.knowledge_base = KnowledgeBase()
+        self.knowledge_base = get_default_knowledge_base()
     
     def enrich_poses(
         self,
@@ -34,28 +45,22 @@ class RAGRetriever:
             List of enriched poses with alignment cues, contraindications, etc.
         """
         enriched = []
+        retrieve = self.knowledge_base.retrieve_by_pose
         
         for pose in pose_candidates:
-            pose_name = pose.get("name")
-            knowledge = self.knowledge_base.retrieve_by_pose(pose_name)
-            
-            enriched_pose = pose.copy()
-            
+            knowledge = retrieve(pose.get("name"))
             if knowledge:
-                enriched_pose["alignment_cues"] = knowledge.get("alignment", [])
-                enriched_pose["contraindications"] = knowledge.get("contraindications", [])
-                enriched_pose["benefits"] = knowledge.get("benefits", [])
-                enriched_pose["breathing_guidance"] = knowledge.get("breathing", "")
-                enriched_pose["modifications"] = knowledge.get("modifications", "")
+                extra = {
+                    "alignment_cues": knowledge.get("alignment", []),
+                    "contraindications": knowledge.get("contraindications", []),
+                    "benefits": knowledge.get("benefits", []),
+                    "breathing_guidance": knowledge.get("breathing", ""),
+                    "modifications": knowledge.get("modifications", ""),
+                }
             else:
                 # Default values if knowledge not found
-                enriched_pose["alignment_cues"] = []
-                enriched_pose["contraindications"] = []
-                enriched_pose["benefits"] = []
-                enriched_pose["breathing_guidance"] = "Breathe deeply and steadily"
-                enriched_pose["modifications"] = ""
-            
-            enriched.append(enriched_pose)
+                extra = {**_DEFAULTS, **{k: [] for k in _LIST_FIELDS}}
+            enriched.append({**pose, **extra})
         
         return enriched
     
@@ -71,34 +76,12 @@ class RAGRetriever:
         if not words:
             logger.info("[RAG] search_for_chat: no query words (len>1), no context")
             return ""
-        scored = []
-        for e in self.knowledge_base.knowledge:
-            pose = (e.get("pose") or "").lower().replace("_", " ")
-            benefits = " ".join(e.get("benefits") or []).lower()
-            alignment = " ".join(e.get("alignment") or []).lower()
-            breathing = (e.get("breathing") or "").lower()
-            modifications = (e.get("modifications") or "").lower()
-            text = f"{pose} {benefits} {alignment} {breathing} {modifications}"
-            hits = sum(1 for w in words if w in text)
-            if hits > 0:
-                scored.append((hits, e))
-        scored.sort(key=lambda x: -x[0])
-        chunks = []
-        for _, e in scored[:limit]:
-            pose = e.get("pose", "")
-            parts = [f"**{pose}**"]
-            if e.get("benefits"):
-                parts.append("Benefits: " + "; ".join(e["benefits"][:3]))
-            if e.get("alignment"):
-                parts.append("Alignment: " + "; ".join(e["alignment"][:3]))
-            if e.get("breathing"):
-                parts.append("Breathing: " + e["breathing"])
-            if e.get("contraindications"):
-                parts.append("Avoid if: " + "; ".join(e["contraindications"][:2]))
-            chunks.append("\n".join(parts))
-        out = "\n\n".join(chunks) if chunks else ""
+        # Inverted-index lookup, then partial top-k selection; ties keep knowledge order
+        counts = self.knowledge_base.match_counts(words)
+        top = [i for i, _ in heapq.nsmallest(limit, counts.items(), key=lambda x: (-x[1], x[0]))]
+        out = "\n\n".join(self.knowledge_base.chat_chunk(i) for i in top)
         if out:
-            pose_ids = [e.get("pose", "") for _, e in scored[:limit]]
+            pose_ids = [self.knowledge_base.knowledge[i].get("pose", "") for i in top]
             logger.info("[RAG] search_for_chat: using RAG context, %d entries matched (poses/topics: %s)", len(pose_ids), pose_ids)
         else:
             logger.info("[RAG] search_for_chat: no RAG matches for query %r → LLM will use built-in/general knowledge only", query[:80])
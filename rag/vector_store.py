@@ -1,11 +1,282 @@
 """
 Vector Store for RAG - Supports multiple vector database backends
 """
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+import heapq
 import json
+import math
 import os
+import random
+import sys
+import threading
+import time
 
 from config import Config
+from .knowledge_io import write_bytes
+
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+except ImportError:  # stdlib fallback
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps_line(obj) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+# Optional HNSW graph (hnswlib) over JSON-store embeddings; below this size a linear scan is as fast
+HNSW_MIN_ENTRIES = 500
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+
+# RAG_EMBEDDING_QUANT=int8 stores JSON-backend embeddings as int8 codes + a per-vector scale
+# (about 4x smaller in memory; scored in blocks of SCORE_BLOCK_ROWS rows)
+SCORE_BLOCK_ROWS = 4096
+
+# Max vectors per Pinecone upsert request in add_knowledge_batch
+UPSERT_BATCH = 100
+# Concurrent Pinecone upsert requests (process-wide, so parallel ingests share one quota)
+UPSERT_WORKERS = int(os.getenv("PINECONE_UPSERT_WORKERS", "8"))
+UPSERT_MAX_ATTEMPTS = 5
+_upsert_slots = threading.BoundedSemaphore(UPSERT_WORKERS)
+
+# Semantic query cache: repeat / near-repeat query embeddings (cosine >= threshold) reuse results
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_THRESHOLD = 0.92
+
+
+def _normalize(vec: List[float]) -> List[float]:
+    """Unit-length copy of an embedding (zero vectors unchanged)."""
+    norm = math.sqrt(sum(x * x for x in vec))
+    return [x / norm for x in vec] if norm else list(vec)
+
+
+def _quantize(vec: List[float]):
+    """Symmetric int8 scalar quantization: (codes in [-127, 127], scale) with vec ~= codes * scale."""
+    peak = max((abs(x) for x in vec), default=0.0)
+    scale = peak / 127 if peak else 1.0
+    return [round(x / scale) for x in vec], scale
+
+
+def _stored_embedding(entry: Dict) -> List[float]:
+    """Float embedding of a JSON-store entry (dequantized if it was stored as int8)."""
+    if "embedding_i8" in entry:
+        scale = entry["embedding_scale"]
+        return [c * scale for c in entry["embedding_i8"]]
+    return entry["embedding"]
+
+
+# Chroma metadata values must be scalars: list fields are stored newline-joined, other
+# structured values as JSON, and these keys record which fields to rebuild on search
+_CHROMA_LIST_KEYS = "_list_fields"
+_CHROMA_JSON_KEYS = "_json_fields"
+
+
+def _share_strings(entries: List[Dict]) -> List[Dict]:
+    """
+    Make equal text values across freshly loaded entries one shared str object (repeated
+    breathing / modification / benefit strings are common); pose names are sys.intern'ed
+    since they are compared and used as keys.
+    """
+    pool: Dict[str, str] = {}
+    share = pool.setdefault
+    for e in entries:
+        if not isinstance(e, dict):
+            continue
+        for key, value in e.items():
+            if isinstance(value, str):
+                e[key] = sys.intern(value) if key == "pose" else share(value, value)
+            elif isinstance(value, list) and value and isinstance(value[0], str):
+                e[key] = [share(v, v) if isinstance(v, str) else v for v in value]
+    return entries
+
+
+def _chroma_metadata(entry: Dict) -> Dict:
+    """Flatten an entry into Chroma-compatible metadata (see _entry_from_chroma)."""
+    meta, lists, structured = {}, [], []
+    for key, value in entry.items():
+        if value is None or key == "embedding":
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            meta[key] = value
+        elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+            meta[key] = "\n".join(value)
+            lists.append(key)
+        else:
+            meta[key] = json.dumps(value)
+            structured.append(key)
+    meta[_CHROMA_LIST_KEYS] = ",".join(lists)
+    meta[_CHROMA_JSON_KEYS] = ",".join(structured)
+    return meta
+
+
+def _entry_from_chroma(meta: Dict, document: Optional[str]) -> Dict:
+    """Entry from stored Chroma metadata (or, for older collections, its JSON document)."""
+    if meta is None or _CHROMA_LIST_KEYS not in meta:
+        return json.loads(document)
+    entry = {k: v for k, v in meta.items() if k not in (_CHROMA_LIST_KEYS, _CHROMA_JSON_KEYS)}
+    for key in filter(None, meta[_CHROMA_LIST_KEYS].split(",")):
+        entry[key] = entry[key].split("\n") if entry[key] else []
+    for key in filter(None, meta.get(_CHROMA_JSON_KEYS, "").split(",")):
+        entry[key] = json.loads(entry[key])
+    return entry
+
+
+def _chroma_document(entry: Dict) -> str:
+    """Plain text Chroma embeds for text queries: pose name and its descriptive fields."""
+    parts = [entry.get("pose", "")]
+    for key in ("benefits", "alignment", "breathing", "modifications"):
+        value = entry.get(key)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(p for p in parts if p)
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    status = getattr(e, "status", None) or getattr(e, "status_code", None)
+    return status == 429 or "429" in str(e) or "Too Many Requests" in str(e)
+
+
+def _upsert_with_backoff(index, vectors: List[tuple]):
+    """One Pinecone upsert, retried with exponential backoff (plus jitter) on HTTP 429."""
+    for attempt in range(UPSERT_MAX_ATTEMPTS):
+        try:
+            with _upsert_slots:
+                return index.upsert(vectors=vectors)
+        except Exception as e:
+            if attempt + 1 == UPSERT_MAX_ATTEMPTS or not _is_rate_limited(e):
+                raise
+            time.sleep(2 ** attempt + random.random())
+
+
+# Text-search fields of a JSON-store entry and the score a query substring match in each adds
+_TEXT_FIELDS = (
+    ("pose", 3, lambda e: e.get("pose", "").lower()),
+    ("benefits", 2, lambda e: " ".join(e.get("benefits", [])).lower()),
+    ("breathing", 1, lambda e: e.get("breathing", "").lower()),
+)
+
+
+class _FieldIndex:
+    """
+    One lowercased text field of every entry (a flat list, in entry order) and its
+    inverted index: whitespace token -> entry indexes.
+    Query words are matched against the token vocabulary as substrings (one scan of the
+    newline-joined vocabulary), so candidates are exactly the entries that can contain
+    the query; callers confirm with a substring test on those few texts.
+    """
+    
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        postings: Dict[str, Set[int]] = {}
+        for i, text in enumerate(texts):
+            for token in set(text.split()):
+                postings.setdefault(token, set()).add(i)
+        self.postings = postings
+        self.vocab = list(postings)
+        self.vocab_text = "\n".join(self.vocab)
+        self.starts = []
+        pos = 0
+        for token in self.vocab:
+            self.starts.append(pos)
+            pos += len(token) + 1
+    
+    def _containing(self, word: str) -> Set[int]:
+        """Entries with a token containing `word`."""
+        hits: Set[int] = set()
+        text, starts, vocab, postings = self.vocab_text, self.starts, self.vocab, self.postings
+        start = text.find(word)
+        while start >= 0:
+            t = bisect_right(starts, start) - 1
+            hits.update(postings[vocab[t]])
+            # Resume at the next token: further hits in this one add nothing
+            start = text.find(word, starts[t] + len(vocab[t]) + 1)
+        return hits
+    
+    def matches(self, query_lower: str, words: List[str]) -> List[int]:
+        """Entries whose text contains `query_lower` (whose whitespace-split words are `words`)."""
+        if not words:  # empty / whitespace-only query: no token to look up, scan the texts
+            return [i for i, text in enumerate(self.texts) if query_lower in text]
+        candidates = None
+        for word in sorted(words, key=len, reverse=True):
+            hits = self._containing(word)
+            candidates = hits if candidates is None else candidates & hits
+            if not candidates:
+                return []
+        if len(words) == 1 and query_lower == words[0]:
+            return list(candidates)  # a single word within a token is a substring match already
+        return [i for i in candidates if query_lower in self.texts[i]]
+
+
+class _SemanticCache:
+    """
+    Bounded most-recently-used cache of (unit query embedding, top_k, results); callers pass
+    unit vectors. A lookup hits when the most similar cached query reaches the cosine threshold
+    and asked for at least as many results; hits move to the front.
+    """
+    
+    def __init__(self, size: int = QUERY_CACHE_SIZE, threshold: float = QUERY_CACHE_THRESHOLD):
+        self.size = size
+        self.threshold = threshold
+        self._items: List[tuple] = []  # most recent first
+        self._matrix = None  # stacked cached vectors (numpy), rebuilt after changes
+    
+    def clear(self):
+        self._items.clear()
+        self._matrix = None
+    
+    def _best(self, q: List[float]) -> int:
+        """Position of the most similar cached query with the same dimension, or -1."""
+        try:
+            import numpy as np
+        except ImportError:
+            best, best_sim = -1, self.threshold
+            for i, (v, _, _) in enumerate(self._items):
+                if len(v) == len(q):
+                    sim = sum(a * b for a, b in zip(v, q))
+                    if sim >= best_sim:
+                        best, best_sim = i, sim
+            return best
+        if self._matrix is None:
+            dim = len(q)
+            self._matrix = np.array(
+                [v if len(v) == dim else [0.0] * dim for v, _, _ in self._items], dtype=np.float32
+            ).reshape(len(self._items), dim)
+        if self._matrix.shape[1] != len(q):
+            self._matrix = None
+            return -1
+        sims = self._matrix @ np.asarray(q, dtype=np.float32)
+        i = int(np.argmax(sims))
+        return i if sims[i] >= self.threshold else -1
+    
+    def get(self, embedding: List[float], top_k: int) -> Optional[List[Dict]]:
+        if not self._items:
+            return None
+        i = self._best(embedding)
+        if i < 0 or self._items[i][1] < top_k:
+            return None
+        if i:
+            self._items.insert(0, self._items.pop(i))
+            self._matrix = None
+        return list(self._items[0][2][:top_k])
+    
+    def put(self, embedding: List[float], top_k: int, results: List[Dict]):
+        self._items.insert(0, (list(embedding), top_k, list(results)))
+        del self._items[self.size:]
+        self._matrix = None
 
 
 class VectorStore:
@@ -23,6 +294,13 @@ class VectorStore:
         """
         self.backend = backend
         self.store = None
+        self._query_cache = _SemanticCache()
+        # Fixed per-phase query embeddings (see set_phase_embeddings) and, for the JSON
+        # backend, their cached (entries x phases) score matrix and per-phase rankings
+        self._phase_vectors: Dict[str, List[float]] = {}
+        self._phase_scores = None
+        self._phase_rows = None
+        self._phase_order: Dict[str, List[int]] = {}
         self._initialize_backend()
     
     def _initialize_backend(self):
@@ -59,7 +337,7 @@ class VectorStore:
                 pinecone.create_index(
                     index_name,
                     dimension=1536,  # OpenAI embedding dimension
-                    metric="cosine"
+                    metric="dotproduct"  # embeddings are unit-length (see add_knowledge_batch)
                 )
             
             self.store = pinecone.Index(index_name)
@@ -104,7 +382,7 @@ class VectorStore:
             self.store = chromadb.PersistentClient(path=persist_directory)
             self.collection = self.store.get_or_create_collection(
                 name="yoga_knowledge",
-                metadata={"description": "Yoga pose knowledge base"}
+                metadata={"description": "Yoga pose knowledge base", "hnsw:space": "ip"}
             )
             print("✓ ChromaDB vector store initialized")
         except ImportError:
@@ -117,18 +395,94 @@ class VectorStore:
             self._init_json()
     
     def _init_json(self):
-        """Initialize simple JSON file backend."""
-        self.json_path = os.getenv("RAG_JSON_PATH", "./rag/knowledge_db.json")
-        os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
+        """
+        Initialize simple JSON file backend: an append-only JSONL file, one entry per line.
+        A legacy knowledge_db.json ({"entries": [...]}) next to it is migrated on first flush.
+        """
+        root = os.path.splitext(os.getenv("RAG_JSON_PATH", "./rag/knowledge_db.jsonl"))[0]
+        self.json_path = root + ".jsonl"
+        os.makedirs(os.path.dirname(self.json_path) or ".", exist_ok=True)
         
+        self.store = {"entries": []}
         if os.path.exists(self.json_path):
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                self.store = json.load(f)
+            entries, clean = self._read_jsonl(self.json_path)
+            self.store["entries"] = _share_strings(entries)
+            # Entries [0, _flushed) are on disk; flush() appends the rest
+            self._flushed = len(entries)
+            self._needs_rewrite = not clean
         else:
-            self.store = {"entries": []}
+            legacy = root + ".json"
+            if os.path.exists(legacy):
+                with open(legacy, "rb") as f:
+                    self.store = _loads(f.read())
+                _share_strings(self.store["entries"])
+            self._flushed = 0
+            self._needs_rewrite = bool(self.store["entries"])
+        # Unit embedding matrix for vector search (see _embedding_index), int8 codes plus
+        # per-row scales when quantized. Built once on first search, then extended by each add.
+        self._quantize = os.getenv("RAG_EMBEDDING_QUANT", "").lower() == "int8"
+        self._emb = None
+        self._emb_scales = None
+        self._emb_rows: List[int] = []
+        self._emb_dim = 0
+        self._emb_dirty = True
+        # Inverted text index per search field, built on first text search (see _text_index)
+        self._text_fields: Optional[List[_FieldIndex]] = None
+        # HNSW graph over the same rows (labels are positions in _emb_rows), saved next to the JSON
+        # with its JSONL signature / dim / rows in .hnsw.json (a graph is reused only if they match)
+        self._hnsw = None
+        self._hnsw_path = os.path.splitext(self.json_path)[0] + ".hnsw"
+        self._hnsw_meta_path = self._hnsw_path + ".json"
+        # Embedding index memoized next to the JSONL: matrix as .npy (memory-mapped on load),
+        # entry rows / scales / JSONL signature in .emb.json (see _load_emb_cache)
+        self._emb_cache_path = root + ".emb.npy"
+        self._emb_meta_path = root + ".emb.json"
         
         print("✓ JSON vector store initialized")
     
+    @staticmethod
+    def _read_jsonl(path: str):
+        """
+        Entries of a JSONL file, and whether it was clean. Unparseable lines (e.g. a torn
+        last append) are skipped; the file is then rewritten on the next flush.
+        """
+        entries, clean = [], True
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(_loads(line))
+                except ValueError:
+                    print(f"Warning: Skipping unreadable line in {path}")
+                    clean = False
+        return entries, clean
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+    
+    def flush(self):
+        """Append entries added since the last flush to the JSONL file (and save the HNSW graph)."""
+        if self.backend != "json":
+            return
+        entries = self.store["entries"]
+        if self._needs_rewrite:
+            self._save_json()
+        elif self._flushed < len(entries):
+            with open(self.json_path, "ab") as f:
+                f.write(b"".join(_dumps_line(e) for e in entries[self._flushed:]))
+            self._flushed = len(entries)
+        else:
+            return
+        if self._hnsw is not None:
+            self._save_hnsw(self._hnsw)
+        if not self._emb_dirty:
+            self._save_emb_cache()
+    
     def add_knowledge(self, knowledge_entry: Dict, embedding: Optional[List[float]] = None):
         """
         Add knowledge entry to vector store.
@@ -137,66 +491,110 @@ class VectorStore:
             knowledge_entry: Dictionary with pose knowledge
             embedding: Optional embedding vector
         """
+        self.add_knowledge_batch([knowledge_entry], [embedding])
+    
+    def add_knowledge_batch(self, entries: List[Dict], embeddings: Optional[List[Optional[List[float]]]] = None):
+        """
+        Add many knowledge entries with one backend round-trip per batch
+        (Pinecone upserts of UPSERT_BATCH vectors, one Chroma add, one JSON save).
+        Embeddings are stored L2-normalized in every backend, so similarity is a plain
+        dot product (Pinecone "dotproduct", Chroma "ip", JSON matrix-vector product).
+        
+        Args:
+            entries: Knowledge entries
+            embeddings: Optional embedding per entry (same order; None for entries without one)
+        """
+        if not entries:
+            return
+        if embeddings is None:
+            embeddings = [None] * len(entries)
+        else:
+            embeddings = [_normalize(v) if v else None for v in embeddings]
+        self._query_cache.clear()
         if self.backend == "pinecone":
-            self._add_to_pinecone(knowledge_entry, embedding)
+            self._add_to_pinecone(entries, embeddings)
         elif self.backend == "weaviate":
-            self._add_to_weaviate(knowledge_entry, embedding)
+            for entry, embedding in zip(entries, embeddings):
+                self._add_to_weaviate(entry, embedding)
         elif self.backend == "chroma":
-            self._add_to_chroma(knowledge_entry, embedding)
+            self._add_to_chroma(entries, embeddings)
         else:  # json
-            self._add_to_json(knowledge_entry)
+            self._add_to_json(entries, embeddings)
     
-    def _add_to_pinecone(self, entry: Dict, embedding: Optional[List[float]]):
-        """Add to Pinecone."""
-        if not embedding:
-            print("Warning: No embedding provided for Pinecone. Skipping.")
-            return
-        
-        pose_name = entry.get("pose", "unknown")
-        metadata = {
-            "pose": pose_name,
-            "alignment": json.dumps(entry.get("alignment", [])),
-            "contraindications": json.dumps(entry.get("contraindications", [])),
-            "benefits": json.dumps(entry.get("benefits", [])),
-            "breathing": entry.get("breathing", ""),
-            "modifications": entry.get("modifications", "")
-        }
+    def _add_to_pinecone(self, entries: List[Dict], embeddings: List[Optional[List[float]]]):
+        """Add to Pinecone in upserts of up to UPSERT_BATCH vectors."""
+        vectors = []
+        for entry, embedding in zip(entries, embeddings):
+            if not embedding:
+                print("Warning: No embedding provided for Pinecone. Skipping.")
+                continue
+            
+            pose_name = entry.get("pose", "unknown")
+            metadata = {
+                "pose": pose_name,
+                "alignment": json.dumps(entry.get("alignment", [])),
+                "contraindications": json.dumps(entry.get("contraindications", [])),
+                "benefits": json.dumps(entry.get("benefits", [])),
+                "breathing": entry.get("breathing", ""),
+                "modifications": entry.get("modifications", "")
+            }
+            vectors.append((pose_name, embedding, metadata))
         
-        self.store.upsert([(pose_name, embedding, metadata)])
+        chunks = [vectors[i:i + UPSERT_BATCH] for i in range(0, len(vectors), UPSERT_BATCH)]
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                _upsert_with_backoff(self.store, chunk)
+            return
+        # The Pinecone index client is thread-safe; overlap the HTTP round-trips
+        with ThreadPoolExecutor(max_workers=min(UPSERT_WORKERS, len(chunks))) as pool:
+            list(pool.map(lambda chunk: _upsert_with_backoff(self.store, chunk), chunks))
     
     def _add_to_weaviate(self, entry: Dict, embedding: Optional[List[float]]):
         """Add to Weaviate."""
         # Implementation for Weaviate
         pass
     
-    def _add_to_chroma(self, entry: Dict, embedding: Optional[List[float]]):
-        """Add to ChromaDB."""
-        pose_name = entry.get("pose", "unknown")
-        document = json.dumps(entry)
+    def _add_to_chroma(self, entries: List[Dict], embeddings: List[Optional[List[float]]]):
+        """Add to ChromaDB: one add for entries with embeddings, one for those without."""
+        with_emb = [(e, emb) for e, emb in zip(entries, embeddings) if emb]
+        without_emb = [e for e, emb in zip(entries, embeddings) if not emb]
         
-        if embedding:
+        if with_emb:
             self.collection.add(
-                ids=[pose_name],
-                embeddings=[embedding],
-                documents=[document],
-                metadatas=[{"pose": pose_name}]
+                ids=[e.get("pose", "unknown") for e, _ in with_emb],
+                embeddings=[emb for _, emb in with_emb],
+                documents=[_chroma_document(e) for e, _ in with_emb],
+                metadatas=[_chroma_metadata(e) for e, _ in with_emb]
             )
-        else:
+        if without_emb:
             self.collection.add(
-                ids=[pose_name],
-                documents=[document],
-                metadatas=[{"pose": pose_name}]
+                ids=[e.get("pose", "unknown") for e in without_emb],
+                documents=[_chroma_document(e) for e in without_emb],
+                metadatas=[_chroma_metadata(e) for e in without_emb]
             )
     
-    def _add_to_json(self, entry: Dict):
-        """Add to JSON file."""
-        self.store["entries"].append(entry)
-        self._save_json()
+    def _add_to_json(self, entries: List[Dict], embeddings: List[Optional[List[float]]]):
+        """Add to the JSON store (with embeddings, where given, for vector search); written on flush()."""
+        stored = self.store["entries"]
+        added = []  # entry indexes with an embedding
+        for entry, embedding in zip(entries, embeddings):
+            if embedding:
+                if self._quantize:
+                    codes, scale = _quantize(embedding)
+                    entry = {**entry, "embedding_i8": codes, "embedding_scale": scale}
+                else:
+                    entry = {**entry, "embedding": list(embedding)}
+                added.append(len(stored))
+            stored.append(entry)
+        if added:
+            self._append_embeddings(added)
+        self._text_fields = None
     
     def _save_json(self):
-        """Save JSON store to file."""
-        with open(self.json_path, "w", encoding="utf-8") as f:
-            json.dump(self.store, f, indent=2, ensure_ascii=False)
+        """Compact: rewrite the whole JSONL file from memory (adds only ever append)."""
+        write_bytes(self.json_path, b"".join(_dumps_line(e) for e in self.store["entries"]))
+        self._flushed = len(self.store["entries"])
+        self._needs_rewrite = False
     
     def search(self, query: str, top_k: int = 5, embedding: Optional[List[float]] = None) -> List[Dict]:
         """
@@ -210,14 +608,26 @@ class VectorStore:
         Returns:
             List of matching knowledge entries
         """
+        if embedding:
+            embedding = _normalize(embedding)  # stored embeddings are unit-length too
+            cached = self._query_cache.get(embedding, top_k)
+            if cached is not None:
+                return cached
+        
         if self.backend == "pinecone":
-            return self._search_pinecone(query, top_k, embedding)
+            results = self._search_pinecone(query, top_k, embedding)
         elif self.backend == "weaviate":
-            return self._search_weaviate(query, top_k, embedding)
+            results = self._search_weaviate(query, top_k, embedding)
         elif self.backend == "chroma":
-            return self._search_chroma(query, top_k, embedding)
+            results = self._search_chroma(query, top_k, embedding)
         else:  # json
-            return self._search_json(query, top_k)
+            results = self._search_json(query, top_k, embedding)
+        
+        # JSON results only depend on the embedding when they came from the vector index
+        # (not the text fallback used when no stored embedding has its dimension)
+        if embedding and (self.backend != "json" or (self._emb_dim == len(embedding) and self._emb_rows)):
+            self._query_cache.put(embedding, top_k, results)
+        return results
     
     def _search_pinecone(self, query: str, top_k: int, embedding: Optional[List[float]]) -> List[Dict]:
         """Search Pinecone."""
@@ -245,31 +655,332 @@ class VectorStore:
                 n_results=top_k
             )
         
-        entries = []
-        for i, doc in enumerate(results.get("documents", [[]])[0]):
-            entries.append(json.loads(doc))
-        return entries
+        metadatas = (results.get("metadatas") or [[]])[0] or []
+        documents = (results.get("documents") or [[]])[0] or []
+        return [
+            _entry_from_chroma(meta, documents[i] if i < len(documents) else None)
+            for i, meta in enumerate(metadatas)
+        ]
     
-    def _search_json(self, query: str, top_k: int) -> List[Dict]:
-        """Simple text search in JSON."""
-        query_lower = query.lower()
-        matches = []
+    def _embedding_index(self, dim: int):
+        """
+        Stored embeddings of `dim` dimensions as unit rows: a float32 matrix (numpy), an int8
+        code matrix with per-row scales in _emb_scales (numpy, quantized store), or a list of
+        rows without numpy, plus the entry index of each row. Rows are normalized here once
+        (older stores may hold raw vectors), so a query scores with one dot product.
+        """
+        if self._emb_dirty or self._emb is None or self._emb_dim != dim:
+            entries = self.store.get("entries", [])
+            rows = [
+                i for i, e in enumerate(entries)
+                if len(e.get("embedding") or e.get("embedding_i8") or ()) == dim
+            ]
+            scales = None
+            cached = None
+            try:
+                import numpy as np
+                cached = self._load_emb_cache(dim)
+                if cached is not None:
+                    emb, scales, rows = cached
+                elif self._quantize:
+                    codes, scales = self._int8_rows(entries[i] for i in rows)
+                    emb = np.array(codes, dtype=np.int8).reshape(len(rows), dim)
+                    scales = np.array(scales, dtype=np.float32)
+                else:
+                    emb = np.array(
+                        [_stored_embedding(entries[i]) for i in rows], dtype=np.float32
+                    ).reshape(len(rows), dim)
+                    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+                    emb /= np.where(norms == 0, 1, norms)
+            except ImportError:
+                emb = [_normalize(_stored_embedding(entries[i])) for i in rows]
+            self._emb, self._emb_scales, self._emb_rows, self._emb_dim = emb, scales, rows, dim
+            self._emb_dirty = False
+            self._hnsw = None
+            if cached is None:
+                self._save_emb_cache()
+        return self._emb, self._emb_rows
+    
+    def _jsonl_signature(self) -> Optional[List[int]]:
+        """[mtime_ns, size] of the JSONL file when it holds every entry in memory, else None."""
+        if self._needs_rewrite or self._flushed != len(self.store["entries"]):
+            return None
+        try:
+            st = os.stat(self.json_path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+    
+    def _load_emb_cache(self, dim: int):
+        """(matrix memory-mapped read-only, scales, rows) from the .npy memo if it matches the JSONL, else None."""
+        import numpy as np
+        sig = self._jsonl_signature()
+        if sig is None:
+            return None
+        try:
+            with open(self._emb_meta_path, "rb") as f:
+                meta = _loads(f.read())
+            if meta["signature"] != sig or meta["dim"] != dim or meta["quantized"] != self._quantize:
+                return None
+            emb = np.load(self._emb_cache_path, mmap_mode="r")
+            rows = meta["rows"]
+            if emb.shape != (len(rows), dim):
+                return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        scales = np.array(meta["scales"], dtype=np.float32) if self._quantize else None
+        return emb, scales, rows
+    
+    def _save_emb_cache(self):
+        """Memoize the numpy embedding index for the next process start (best effort)."""
+        sig = self._jsonl_signature()
+        if sig is None or self._emb is None or isinstance(self._emb, list):
+            return
+        import numpy as np
+        meta = {
+            "signature": sig,
+            "dim": self._emb_dim,
+            "quantized": self._emb_scales is not None,
+            "rows": self._emb_rows,
+            "scales": None if self._emb_scales is None else self._emb_scales.tolist(),
+        }
+        try:
+            tmp = self._emb_cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(self._emb))
+            os.replace(tmp, self._emb_cache_path)
+            with open(self._emb_meta_path, "wb") as f:
+                f.write(_dumps_line(meta))
+        except OSError as e:
+            print(f"Warning: Failed to save embedding cache: {e}")
+    
+    @staticmethod
+    def _int8_rows(entries: Iterable[Dict]):
+        """int8 codes and scales for entries, quantizing float embeddings as they come."""
+        codes, scales = [], []
+        for e in entries:
+            if "embedding_i8" in e:
+                c, s = e["embedding_i8"], e["embedding_scale"]
+            else:
+                c, s = _quantize(_normalize(e["embedding"]))
+            codes.append(c)
+            scales.append(s)
+        return codes, scales
+    
+    def _dense_rows(self, start: int = 0, stop: Optional[int] = None):
+        """Rows [start, stop) of the numpy embedding index as float32 (dequantized if int8)."""
+        import numpy as np
+        block = self._emb[start:stop]
+        if self._emb_scales is None:
+            return block
+        return block.astype(np.float32) * self._emb_scales[start:stop, None]
+    
+    def _vector_scores(self, q):
+        """Dot product of every index row with unit query q (numpy), block by block when int8."""
+        import numpy as np
+        if self._emb_scales is None:
+            return self._emb @ q
+        n = len(self._emb_rows)
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            stop = min(start + SCORE_BLOCK_ROWS, n)
+            scores[start:stop] = (self._emb[start:stop].astype(np.float32) @ q) * self._emb_scales[start:stop]
+        return scores
+    
+    def _hnsw_index(self):
+        """
+        HNSW graph over the current embedding index, loaded from disk when it matches or
+        built (and saved) otherwise. Returns None if hnswlib/numpy are missing or the
+        store is too small to benefit.
+        """
+        if self._hnsw is not None:
+            return self._hnsw
+        rows = self._emb_rows
+        if len(rows) < HNSW_MIN_ENTRIES or isinstance(self._emb, list):
+            return None
+        try:
+            import hnswlib
+            import numpy as np
+        except ImportError:
+            return None
+        index = hnswlib.Index(space="ip", dim=self._emb_dim)
+        try:
+            sig = self._jsonl_signature()
+            with open(self._hnsw_meta_path, "rb") as f:
+                meta = _loads(f.read())
+            if sig is None or meta["signature"] != sig or meta["dim"] != self._emb_dim or meta["rows"] != rows:
+                raise ValueError("stale HNSW index")
+            index.load_index(self._hnsw_path, max_elements=len(rows))
+            if index.get_current_count() != len(rows):
+                raise ValueError("stale HNSW index")
+        except Exception:
+            index = hnswlib.Index(space="ip", dim=self._emb_dim)
+            index.init_index(max_elements=len(rows), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            index.add_items(self._dense_rows(), np.arange(len(rows)))
+            self._save_hnsw(index)
+        index.set_ef(HNSW_EF_SEARCH)
+        self._hnsw = index
+        return index
+    
+    def _save_hnsw(self, index):
+        """
+        Persist the HNSW graph with the JSONL signature it was built against (best effort; it
+        is rebuilt from the JSON if missing or stale). Without a signature (entries not yet
+        flushed) the old metadata is removed, so the graph is not trusted until the next flush.
+        """
+        sig = self._jsonl_signature()
+        try:
+            if os.path.exists(self._hnsw_meta_path):
+                os.remove(self._hnsw_meta_path)
+            index.save_index(self._hnsw_path)
+            if sig is not None:
+                meta = {"signature": sig, "dim": self._emb_dim, "rows": self._emb_rows}
+                with open(self._hnsw_meta_path, "wb") as f:
+                    f.write(_dumps_line(meta))
+        except Exception as e:
+            print(f"Warning: Failed to save HNSW index: {e}")
+    
+    def _append_embeddings(self, added: List[int]):
+        """Extend a built embedding index with newly stored entries (their indexes) with unit embeddings."""
+        if self._emb_dirty or self._emb is None:
+            return
+        entries = self.store["entries"]
+        added = [
+            i for i in added
+            if len(entries[i].get("embedding") or entries[i].get("embedding_i8") or ()) == self._emb_dim
+        ]
+        if not added:
+            return
+        if isinstance(self._emb, list):
+            self._emb.extend(_stored_embedding(entries[i]) for i in added)
+        else:
+            import numpy as np
+            first = len(self._emb_rows)
+            if self._emb_scales is None:
+                new = np.array([_stored_embedding(entries[i]) for i in added], dtype=np.float32)
+            else:
+                codes, scales = self._int8_rows(entries[i] for i in added)
+                new = np.array(codes, dtype=np.int8)
+                self._emb_scales = np.concatenate((self._emb_scales, np.array(scales, dtype=np.float32)))
+            self._emb = np.vstack((self._emb, new))
+            if self._hnsw is not None:
+                needed = first + len(added)
+                if needed > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(max(needed, 2 * first))
+                self._hnsw.add_items(self._dense_rows(first, needed), np.arange(first, needed))
+        self._emb_rows.extend(added)
+    
+    def _search_json_vector(self, embedding: List[float], top_k: int) -> List[Dict]:
+        """Cosine-similarity search over stored entry embeddings (unit vectors: a dot product)."""
+        emb, rows = self._embedding_index(len(embedding))
+        if not rows or top_k <= 0:
+            return []
+        entries = self.store["entries"]
+        if isinstance(emb, list):
+            scores = [sum(a * b for a, b in zip(row, embedding)) for row in emb]
+            best = heapq.nsmallest(top_k, range(len(rows)), key=lambda i: (-scores[i], i))
+            return [entries[rows[i]] for i in best]
+        import numpy as np
+        q = np.asarray(embedding, dtype=np.float32)
+        hnsw = self._hnsw_index()
+        if hnsw is not None:
+            labels, _ = hnsw.knn_query(q, k=min(top_k, len(rows)))
+            return [entries[rows[i]] for i in labels[0]]
+        scores = self._vector_scores(q)
+        if top_k < len(rows):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+        else:
+            best = np.argsort(-scores, kind="stable")
+        return [entries[rows[i]] for i in best]
+    
+    def set_phase_embeddings(self, embeddings: Dict[str, List[float]]):
+        """
+        Register one query embedding per cycle phase (e.g. "menstrual", "luteal").
         
-        for entry in self.store.get("entries", []):
-            score = 0
-            pose_name = entry.get("pose", "").lower()
-            benefits = " ".join(entry.get("benefits", [])).lower()
-            breathing = entry.get("breathing", "").lower()
-            
-            if query_lower in pose_name:
-                score += 3
-            if query_lower in benefits:
-                score += 2
-            if query_lower in breathing:
-                score += 1
-            
-            if score > 0:
-                matches.append((score, entry))
+        Args:
+            embeddings: Phase name -> query embedding
+        """
+        self._phase_vectors = {phase: _normalize(v) for phase, v in embeddings.items()}
+        self._phase_scores = None
+        self._phase_rows = None
+        self._phase_order = {}
+    
+    def search_by_phase(self, phase: str, top_k: int = 5) -> List[Dict]:
+        """
+        Entries most similar to a registered phase embedding. On the JSON backend the
+        scores against all phases come from one cached matrix (extended as entries are
+        added), so a repeat lookup is a slice of a precomputed ranking.
         
-        matches.sort(reverse=True, key=lambda x: x[0])
-        return [entry for _, entry in matches[:top_k]]
+        Args:
+            phase: Cycle phase name
+            top_k: Number of results to return
+        
+        Returns:
+            List of matching knowledge entries
+        """
+        vector = self._phase_vectors.get(phase)
+        if vector is None:
+            return self.search(phase, top_k)
+        if self.backend != "json":
+            return self.search(phase, top_k, embedding=vector)
+        order = self._phase_ranking(phase, len(vector))
+        if not order:
+            return self._search_json(phase, top_k)
+        entries = self.store["entries"]
+        return [entries[self._emb_rows[i]] for i in order[:top_k]]
+    
+    def _phase_ranking(self, phase: str, dim: int) -> List[int]:
+        """Index rows by descending similarity to `phase` (entry order among ties)."""
+        emb, rows = self._embedding_index(dim)
+        if not rows:
+            return []
+        phases = [p for p, v in self._phase_vectors.items() if len(v) == dim]
+        done = len(self._phase_scores) if self._phase_rows is rows and self._phase_scores is not None else 0
+        if done < len(rows):
+            # Score only the rows added since the matrix was built (all of them after a rebuild)
+            if isinstance(emb, list):
+                new = [[sum(a * b for a, b in zip(row, self._phase_vectors[p])) for p in phases] for row in emb[done:]]
+                self._phase_scores = (self._phase_scores if done else []) + new
+            else:
+                import numpy as np
+                vecs = np.array([self._phase_vectors[p] for p in phases], dtype=np.float32)
+                new = self._dense_rows(done) @ vecs.T
+                self._phase_scores = np.vstack((self._phase_scores, new)) if done else new
+            self._phase_rows = rows
+            self._phase_order = {}
+        order = self._phase_order.get(phase)
+        if order is None:
+            col = phases.index(phase)
+            if isinstance(emb, list):
+                order = sorted(range(len(rows)), key=lambda i: -self._phase_scores[i][col])
+            else:
+                import numpy as np
+                order = np.argsort(-self._phase_scores[:, col], kind="stable").tolist()
+            self._phase_order[phase] = order
+        return order
+    
+    def _text_index(self) -> List[_FieldIndex]:
+        """Per-field inverted indexes over the stored entries (rebuilt after adds)."""
+        if self._text_fields is None:
+            entries = self.store.get("entries", [])
+            self._text_fields = [_FieldIndex([text(e) for e in entries]) for _, _, text in _TEXT_FIELDS]
+        return self._text_fields
+    
+    def _search_json(self, query: str, top_k: int, embedding: Optional[List[float]] = None) -> List[Dict]:
+        """Vector search when a query embedding is given and entries have embeddings, else simple text search in JSON."""
+        if embedding:
+            results = self._search_json_vector(embedding, top_k)
+            if results:
+                return results
+        query_lower = query.lower()
+        words = query_lower.split()
+        scores: Counter = Counter()
+        for (_, weight, _), index in zip(_TEXT_FIELDS, self._text_index()):
+            for i in index.matches(query_lower, words):
+                scores[i] += weight
+        # Highest score first, entry order among ties (as the stable full sort did);
+        # only the winning rows are turned back into entries
+        best = heapq.nsmallest(top_k, scores, key=lambda i: (-scores[i], i)) if top_k > 0 else []
+        entries = self.store["entries"]
+        return [entries[i] for i in best]
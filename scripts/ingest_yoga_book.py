@@ -62,9 +62,8 @@ def main():
         from rag.ingest import ingest_from_json
         entries = ingest_from_json(str(src), save_to_rag=True)
     elif suff in (".txt", ".md"):
-        from rag.ingest import ingest_from_text
-        text = src.read_text(encoding="utf-8", errors="replace")
-        entries = ingest_from_text(text, save_to_rag=True, source_is_philosophy=philosophy)
+        from rag.ingest import ingest_from_text_file
+        entries = ingest_from_text_file(str(src), save_to_rag=True, source_is_philosophy=philosophy)
         if not entries:
             print("No entries extracted. Set GROQ_API_KEY (or OPENAI/ANTHROPIC) for text extraction.")
     else:
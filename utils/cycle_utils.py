@@ -1,12 +1,51 @@
 """
 Cycle utilities for calculating menstrual cycle phases
 """
-from datetime import datetime, timedelta
-from typing import Literal, Optional, Tuple
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import Literal, Mapping, Optional, Tuple
 
 
 CyclePhase = Literal["menstrual", "follicular", "ovulation", "luteal"]
 
+# Phase by day in cycle (typical 28-day cycle); every later day is luteal
+_PHASE_BY_DAY: Tuple[CyclePhase, ...] = (
+    ("menstrual",) * 6 + ("follicular",) * 8 + ("ovulation",) * 3 + ("luteal",)
+)
+_LAST_PHASE_DAY = len(_PHASE_BY_DAY) - 1
+
+# Read-only intensity guidance per phase, shared by every caller
+_PHASE_GUIDANCE: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    "menstrual": MappingProxyType({
+        "recommended_intensity": "low",
+        "energy_level": "low",
+        "focus": "restorative"
+    }),
+    "follicular": MappingProxyType({
+        "recommended_intensity": "moderate_to_high",
+        "energy_level": "increasing",
+        "focus": "strength_building"
+    }),
+    "ovulation": MappingProxyType({
+        "recommended_intensity": "high",
+        "energy_level": "peak",
+        "focus": "peak_performance"
+    }),
+    "luteal": MappingProxyType({
+        "recommended_intensity": "moderate_to_low",
+        "energy_level": "decreasing",
+        "focus": "gentle_movement"
+    })
+})
+
+
+def _parse_date(value: str) -> date:
+    """YYYY-MM-DD string to date (fast ISO parser; strptime for forms like 2024-1-5)."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
 
 def calculate_cycle_phase(
     last_period_date: str,
@@ -24,8 +63,8 @@ def calculate_cycle_phase(
     Returns:
         Tuple of (phase_name, day_in_cycle)
     """
-    last_date = datetime.strptime(last_period_date, "%Y-%m-%d")
-    current = datetime.strptime(current_date, "%Y-%m-%d") if current_date else datetime.now()
+    last_date = _parse_date(last_period_date)
+    current = _parse_date(current_date) if current_date else date.today()
     
     days_since_period = (current - last_date).days
     
@@ -33,45 +72,16 @@ def calculate_cycle_phase(
     day_in_cycle = days_since_period % cycle_length
     
     # Phase calculation (typical 28-day cycle)
-    if day_in_cycle <= 5:
-        phase = "menstrual"
-    elif day_in_cycle <= 13:
-        phase = "follicular"
-    elif day_in_cycle <= 16:
-        phase = "ovulation"
-    else:
-        phase = "luteal"
+    phase = _PHASE_BY_DAY[min(max(day_in_cycle, 0), _LAST_PHASE_DAY)]
     
     return phase, day_in_cycle
 
 
-def get_phase_intensity_guidance(phase: CyclePhase) -> dict:
+def get_phase_intensity_guidance(phase: CyclePhase) -> Mapping[str, str]:
     """
     Get intensity guidance for each cycle phase.
     
     Returns:
-        Dictionary with intensity recommendations
+        Read-only mapping with intensity recommendations (shared; copy with dict() to modify)
     """
-    guidance = {
-        "menstrual": {
-            "recommended_intensity": "low",
-            "energy_level": "low",
-            "focus": "restorative"
-        },
-        "follicular": {
-            "recommended_intensity": "moderate_to_high",
-            "energy_level": "increasing",
-            "focus": "strength_building"
-        },
-        "ovulation": {
-            "recommended_intensity": "high",
-            "energy_level": "peak",
-            "focus": "peak_performance"
-        },
-        "luteal": {
-            "recommended_intensity": "moderate_to_low",
-            "energy_level": "decreasing",
-            "focus": "gentle_movement"
-        }
-    }
-    return guidance.get(phase, guidance["menstrual"])
+    return _PHASE_GUIDANCE.get(phase, _PHASE_GUIDANCE["menstrual"])
@@ -1,10 +1,24 @@
 """
 Time utilities for yoga flow generation
 """
-from datetime import datetime, timedelta
-from typing import Tuple
+import functools
+import math
+import sys
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence
 
+# ASCII whitespace bytes (str.split / str.strip separators in the ASCII range)
+_WS = frozenset(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")
+_ZERO, _NINE, _DOT = ord("0"), ord("9"), ord(".")
+# Minutes per unit word (seconds are not a unit here: "20 sec" falls back to the default)
+_UNIT = {
+    b"hour": 60, b"hours": 60, b"hr": 60, b"hrs": 60,
+    b"min": 1, b"mins": 1, b"minute": 1, b"minutes": 1,
+}
+_HOUR_UNITS = (" hour", " hours")  # indexed by hours > 1
 
+
+@functools.lru_cache(maxsize=128, typed=True)
 def parse_duration(duration_str: str) -> int:
     """
     Parse duration string to minutes.
@@ -13,27 +27,95 @@ def parse_duration(duration_str: str) -> int:
         "20 min" -> 20
         "1 hour" -> 60
         "30" -> 30
+        30 -> 30
     
     Args:
-        duration_str: Duration string
+        duration_str: Duration string (an int is taken as minutes already)
     
     Returns:
         Duration in minutes
     """
-    duration_str = duration_str.lower().strip()
+    if type(duration_str) is int:
+        return duration_str
+    if duration_str.isascii():
+        if duration_str.isdigit() and len(duration_str) < 16:
+            return int(duration_str)
+        minutes = _parse_duration_ascii(duration_str.encode("ascii"))
+        if minutes is not None:
+            return minutes
+    return _parse_duration_slow(duration_str)
+
+
+def _parse_duration_ascii(buf: bytes):
+    """
+    Single forward pass over "<number>[ <unit>]" (e.g. b"20 min", b"1.5 hours"); the unit
+    word is looked up in _UNIT. Returns None for anything
+    else (signs, exponents, "20min", other words, ...) so the general parser decides,
+    which keeps results identical to it.
+    """
+    n = len(buf)
+    i = 0
+    while i < n and buf[i] in _WS:
+        i += 1
+    start = i
+    value = 0
+    while i < n and _ZERO <= buf[i] <= _NINE:
+        value = value * 10 + (buf[i] - _ZERO)
+        i += 1
+    digits = i - start
+    if i < n and buf[i] == _DOT:
+        i += 1
+        while i < n and _ZERO <= buf[i] <= _NINE:
+            i += 1
+        if i - start == 1:
+            return None  # a lone "."
+        value = float(buf[start:i])
+    elif digits == 0 or digits > 15:
+        return None  # no number, or too long to be exact as a float
+    number_end = i
+    while i < n and buf[i] in _WS:
+        i += 1
+    if i == n:
+        return int(value)  # no unit: minutes
+    if i == number_end:
+        return None  # unit glued to the number
+    scale = _UNIT.get(buf[i:].rstrip().lower())
+    if scale is None:
+        return None
+    return int(value * scale)
+
+
+def _parse_duration_slow(duration_str: str) -> int:
+    """General parser (any input); parse_duration's fast path defers to it."""
+    # strip() hands back the same object when there is nothing to strip, and an islower()
+    # string is already its own lower(), so clean input is not copied
+    duration_str = duration_str.strip()
+    if not duration_str.islower():
+        duration_str = duration_str.lower()
     
+    # int() skips the float round-trip; the length limits keep it exact where float was
     if "hour" in duration_str or "hr" in duration_str:
-        hours = float(duration_str.split()[0])
-        return int(hours * 60)
+        scale = 60
     elif "min" in duration_str:
-        minutes = float(duration_str.split()[0])
-        return int(minutes)
+        scale = 1
     else:
         # Assume minutes if no unit specified
+        if len(duration_str) < 16:
+            try:
+                return int(duration_str)
+            except ValueError:
+                pass
         try:
             return int(float(duration_str))
         except ValueError:
             return 20  # Default
+    
+    # Only the first token is needed: stop after one split. (partition(" ") would miss
+    # tabs and other whitespace that split() separates on.)
+    number = duration_str.split(maxsplit=1)[0]
+    if number.isdigit() and len(number) < 14:
+        return int(number) * scale
+    return int(float(number) * scale)
 
 
 def format_duration(minutes: int) -> str:
@@ -46,40 +128,125 @@ def format_duration(minutes: int) -> str:
     Returns:
         Formatted string (e.g., "20 min", "1 hour 15 min")
     """
+    if type(minutes) is int and 0 <= minutes < len(_FMT):
+        return _FMT[minutes]
+    return _slow_format(minutes)
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def _slow_format(minutes: int) -> str:
+    """format_duration for values outside the precomputed table (and non-int values)."""
     if minutes < 60:
         return f"{minutes} min"
-    else:
-        hours = minutes // 60
-        remaining_minutes = minutes % 60
-        if remaining_minutes == 0:
-            return f"{hours} hour{'s' if hours > 1 else ''}"
-        else:
-            return f"{hours} hour{'s' if hours > 1 else ''} {remaining_minutes} min"
+    hours, remaining_minutes = divmod(minutes, 60)
+    hours_text = str(hours) + _HOUR_UNITS[hours > 1]  # plural picked by index, no branch
+    if remaining_minutes == 0:
+        return hours_text
+    return "".join((hours_text, " ", str(remaining_minutes), " min"))
+
+
+# format_duration results for 0..360 minutes (every realistic session length)
+_FMT = tuple(_slow_format.__wrapped__(i) for i in range(361))
 
 
 def calculate_time_allocation(
     total_minutes: int,
-    sections: list[str]
-) -> dict[str, int]:
+    sections: Sequence[str],
+    weights: Optional[Sequence[float]] = None
+) -> Mapping[str, int]:
     """
     Calculate time allocation for different sections.
     
     Args:
         total_minutes: Total session duration
-        sections: List of section names
+        sections: Section names (any sequence; frozen to a tuple for the result cache)
+        weights: Optional relative weight per section. Minutes are split in proportion
+            and leftover minutes go to the largest fractional shares (largest remainder).
+            Without weights, time is split evenly and the first sections get the leftovers.
     
     Returns:
-        Dictionary mapping section names to allocated minutes
+        Read-only mapping of section names to allocated minutes (shared between calls;
+        use dict(result) for a mutable copy)
     """
+    if weights is None:
+        sections = tuple(sections)
+        if type(total_minutes) is int:
+            allocation = _PRECOMPUTED.get((total_minutes, sections))
+            if allocation is not None:
+                return allocation
+        return _calc_alloc_cached(total_minutes, sections)
+    return _calc_weighted_alloc(total_minutes, tuple(sections), tuple(weights))
+
+
+_EMPTY_ALLOCATION: Mapping[str, int] = MappingProxyType({})
+
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _calc_alloc_cached(total_minutes: int, sections: tuple[str, ...]) -> Mapping[str, int]:
+    """Even split for calculate_time_allocation; a read-only view, so safe to share."""
     num_sections = len(sections)
     if num_sections == 0:
-        return {}
-    
-    base_time = total_minutes // num_sections
-    remainder = total_minutes % num_sections
+        return _EMPTY_ALLOCATION
+    sections = _intern_sections(sections)
     
-    allocation = {}
-    for i, section in enumerate(sections):
-        allocation[section] = base_time + (1 if i < remainder else 0)
+    base_time, remainder = divmod(total_minutes, num_sections)
+    if remainder == 0:
+        # Divides evenly (and always for a single section): one C-level build
+        return MappingProxyType(dict.fromkeys(sections, base_time))
+    # The first `remainder` sections get one extra minute
+    if type(remainder) is int:
+        # Build the minutes column with list repetition (C-level, any section count)
+        minutes = [base_time + 1] * remainder + [base_time] * (num_sections - remainder)
+        return MappingProxyType(dict(zip(sections, minutes)))
+    # Float totals: the remainder need not be whole, so compare per index (bool adds as 0/1)
+    return MappingProxyType({
+        section: base_time + (i < remainder)
+        for i, section in enumerate(sections)
+    })
+
+
+@functools.lru_cache(maxsize=128)
+def _calc_weighted_alloc(
+    total_minutes: int,
+    sections: tuple[str, ...],
+    weights: tuple[float, ...]
+) -> Mapping[str, int]:
+    """Split by weight with the largest-remainder method; a read-only view, like the even split."""
+    if len(weights) != len(sections):
+        raise ValueError(f"Got {len(weights)} weights for {len(sections)} sections")
+    if not sections:
+        return _EMPTY_ALLOCATION
+    sections = _intern_sections(sections)
+    total_weight = sum(weights)
+    if total_weight <= 0:
+        raise ValueError("weights must sum to a positive value")
     
-    return allocation
+    raw = [total_minutes * w / total_weight for w in weights]
+    minutes = [math.floor(r) for r in raw]
+    leftover = int(total_minutes - sum(minutes))
+    # Stable sort: equal fractions favour earlier sections
+    by_fraction = sorted(range(len(raw)), key=lambda i: raw[i] - minutes[i], reverse=True)
+    for i in by_fraction[:leftover]:
+        minutes[i] += 1
+    return MappingProxyType(dict(zip(sections, minutes)))
+
+
+def _intern_sections(sections: tuple[str, ...]) -> tuple[str, ...]:
+    """Intern identifier-like section names, so result keys hash and compare by identity."""
+    return tuple(
+        sys.intern(s) if type(s) is str and s.isidentifier() else s
+        for s in sections
+    )
+
+
+# Even splits for the planner's standard session shapes (breathing, main flow, cool_down)
+# at common session lengths, built once at import
+_STANDARD_SECTIONS = tuple(
+    ("breathing", flow, "cool_down")
+    for flow in ("gentle_flow", "moderate_flow", "dynamic_flow")
+)
+_PRECOMPUTED: dict[tuple[int, tuple[str, ...]], Mapping[str, int]] = {
+    (minutes, sections): _calc_alloc_cached.__wrapped__(minutes, sections)
+    for minutes in (10, 15, 20, 30, 45, 60, 75, 90)
+    for sections in _STANDARD_SECTIONS
+}